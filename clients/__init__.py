@@ -5,14 +5,62 @@ This package contains client implementations for different services
 used in the LLM evaluations project.
 """
 
-from .fd_client import FinancialDatasetsClient
-from .openai_client import OpenAIClient  
-from .anthropic_client import AnthropicClient
-from .gemini_client import GeminiClient
+import asyncio
+import importlib
+
+from dotenv import load_dotenv
+
+# Load environment variables once for every client module, before any of
+# them reads its configuration
+load_dotenv()
+
+from ._cache import LLMCache
+from ._concurrency import AIMDController, parallel_map, retry_async
+from ._http import close_shared_async_client
+
+# Clients are imported on first access, so only the provider SDKs actually
+# used get loaded
+_LAZY = {
+    "FinancialDatasetsClient": ".fd_client",
+    "OpenAIClient": ".openai_client",
+    "AnthropicClient": ".anthropic_client",
+    "GeminiClient": ".gemini_client",
+    "KimiClient": ".kimi_client",
+    "DeepSeekClient": ".deepseek_client",
+}
 
 __all__ = [
     "FinancialDatasetsClient",
-    "OpenAIClient", 
+    "OpenAIClient",
     "AnthropicClient",
     "GeminiClient",
-] 
\ No newline at end of file
+    "KimiClient",
+    "DeepSeekClient",
+    "warmup_all",
+    "close_shared_async_client",
+    "parallel_map",
+    "retry_async",
+    "AIMDController",
+    "LLMCache",
+]
+
+
+async def warmup_all(clients: list, concurrency: int = 16) -> None:
+    """
+    Pre-open `concurrency` connections per client before an evaluation run.
+    
+    Warm-up is best effort: a provider that fails here will surface the
+    error again on its first real call.
+    """
+    await asyncio.gather(
+        *(client.warmup(concurrency) for client in clients),
+        return_exceptions=True,
+    ) 
+
+
+def __getattr__(name: str):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
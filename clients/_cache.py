@@ -0,0 +1,167 @@
+"""
+On-disk response cache for deterministic LLM calls.
+
+Responses are stored as JSON under `.cache/{provider}/{hash}.json`, keyed by an
+MD5 hash of the canonical request arguments. Caching is opt-in: it only applies
+when the LLM_CACHE environment variable is set and the call uses temperature 0,
+since sampled outputs are not reproducible.
+
+Cache hits are restored with `model_construct`, skipping pydantic validation:
+the payload was serialized by the SDK's own response model, so it is trusted.
+Response classes whose `model_construct` does not rebuild nested models (the
+Gemini types) opt back into validation with `validate=True`.
+
+LLMCache sits one level up: it stores an experiment's parsed results per
+(model, prompt), so an interrupted or repeated run skips every prompt it has
+already answered.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Awaitable, Callable
+
+import orjson
+
+CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".cache")
+
+
+def cache_enabled(temperature: float) -> bool:
+    """Return True if a call with this temperature should go through the cache."""
+    return temperature == 0.0 and bool(os.getenv("LLM_CACHE"))
+
+
+def request_hash(request: dict[str, any]) -> str:
+    """Hash request arguments serialized as canonical JSON."""
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.md5(canonical.encode("utf-8")).hexdigest()
+
+
+def cached_call(
+    provider: str,
+    request: dict[str, any],
+    fn: Callable[[], any],
+    response_cls: type,
+    validate: bool = False
+) -> any:
+    """Return the cached response for `request`, calling `fn` and storing its result on a miss."""
+    path = _cache_path(provider, request)
+    cached = _load(path, response_cls, validate)
+    if cached is not None:
+        return cached
+
+    response = fn()
+    _store(path, response)
+    return response
+
+
+async def acached_call(
+    provider: str,
+    request: dict[str, any],
+    fn: Callable[[], Awaitable[any]],
+    response_cls: type,
+    validate: bool = False
+) -> any:
+    """Async variant of cached_call() for coroutine-returning `fn`."""
+    path = _cache_path(provider, request)
+    cached = _load(path, response_cls, validate)
+    if cached is not None:
+        return cached
+
+    response = await fn()
+    _store(path, response)
+    return response
+
+
+def _cache_path(provider: str, request: dict[str, any]) -> str:
+    return os.path.join(CACHE_DIR, provider, f"{request_hash(request)}.json")
+
+
+def _load(path: str, response_cls: type, validate: bool) -> any:
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+        if validate:
+            return response_cls.model_validate(data)
+        return response_cls.model_construct(**data)
+    except (OSError, ValueError, TypeError):
+        # Treat unreadable or stale-schema entries as a miss
+        return None
+
+
+def _store(path: str, response: any) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Write to a temporary file first so readers never see a partial entry
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(response.model_dump_json())
+    os.replace(tmp_path, path)
+
+
+class LLMCache:
+    """
+    Parsed-result cache keyed by a SHA-256 of the model, canonical messages and
+    (optionally) the tool definitions the result was parsed against.
+    
+    Entries are stored as JSON under `{CACHE_DIR}/{namespace}/{model}/{hash}.json`.
+    Like the response cache it is opt-in through LLM_CACHE, but it applies at
+    any temperature since it holds the caller's own results, not raw responses.
+    Entries older than `ttl_days` (default: LLM_CACHE_TTL_DAYS, else no limit)
+    count as misses, so results from an outdated model snapshot age out.
+    """
+
+    def __init__(self, namespace: str = "results", enabled: bool | None = None, ttl_days: float | None = None):
+        self.directory = os.path.join(CACHE_DIR, namespace)
+        self.enabled = bool(os.getenv("LLM_CACHE")) if enabled is None else enabled
+        if ttl_days is None and os.getenv("LLM_CACHE_TTL_DAYS"):
+            ttl_days = float(os.getenv("LLM_CACHE_TTL_DAYS"))
+        self.ttl = None if ttl_days is None else ttl_days * 86400
+
+    @staticmethod
+    def key(model: str, messages: list[dict[str, any]], tools: list[dict[str, any]] | None = None) -> str:
+        canonical = json.dumps(messages, sort_keys=True, separators=(",", ":"), default=str)
+        if tools is not None:
+            # A changed tool schema changes what the cached result means
+            canonical += json.dumps(tools, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256((model + canonical).encode("utf-8")).hexdigest()
+
+    def get(self, model: str, messages: list[dict[str, any]], tools: list[dict[str, any]] | None = None) -> any:
+        """Return the value stored for this prompt, or None on a miss or when disabled."""
+        if not self.enabled:
+            return None
+
+        path = self._path(model, messages, tools)
+        try:
+            if self.ttl is not None and time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path, "rb") as f:
+                return orjson.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def set(
+        self,
+        model: str,
+        messages: list[dict[str, any]],
+        value: any,
+        tools: list[dict[str, any]] | None = None
+    ) -> None:
+        """Store a JSON-serializable value for this prompt."""
+        if not self.enabled:
+            return
+
+        path = self._path(model, messages, tools)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(value))
+        os.replace(tmp_path, path)
+
+    def _path(self, model: str, messages: list[dict[str, any]], tools: list[dict[str, any]] | None) -> str:
+        return os.path.join(self.directory, model.replace("/", "_"), f"{self.key(model, messages, tools)}.json")
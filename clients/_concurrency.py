@@ -0,0 +1,231 @@
+"""
+Bounded-concurrency helpers for fanning out async LLM calls.
+
+parallel_map keeps at most `concurrency` calls in flight - matched to the
+shared connection pool and provider rate limits - and retries transient
+failures with exponential backoff and jitter.
+
+AIMDController adapts a provider's concurrency at runtime instead: it grows
+additively while calls succeed within a target latency and halves on slow
+calls or transient errors, opening a circuit breaker on sustained 429s.
+"""
+
+import asyncio
+import random
+import statistics
+import time
+from collections import deque
+from typing import Awaitable, Callable, Iterable
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors
+# and Anthropic's 529 "overloaded"
+TRANSIENT_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# Connection-level SDK errors carry no status code; matched by name so this
+# module does not have to import every provider SDK
+TRANSIENT_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "TransportError", "TimeoutException"}
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Return True if `exc` looks like a rate limit, timeout or server-side failure."""
+    # OpenAI/Anthropic errors expose status_code, Gemini errors expose code
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    if isinstance(status, int) and status in TRANSIENT_STATUS_CODES:
+        return True
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(exc).__mro__)
+
+
+async def retry_async(
+    fn: Callable[[], Awaitable[any]],
+    retries: int = 3,
+    backoff: float = 2.0,
+    max_delay: float = 60.0,
+    on_retry: Callable[[int, BaseException], None] | None = None
+) -> any:
+    """
+    Await `fn()`, retrying transient errors up to `retries` times with backoff and jitter.
+    
+    Permanent errors (validation failures, other 4xx) are raised immediately.
+    `on_retry(attempt, exc)` is called before each retry, e.g. for logging.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return await fn()
+        except Exception as exc:
+            if attempt == retries or not is_transient_error(exc):
+                raise
+            if on_retry:
+                on_retry(attempt + 1, exc)
+            await asyncio.sleep(min(backoff ** attempt, max_delay) + random.random())
+
+
+async def parallel_map(
+    afn: Callable[[any], Awaitable[any]],
+    inputs: Iterable[any],
+    concurrency: int = 32,
+    retries: int = 3,
+    backoff: float = 2.0,
+    on_progress: Callable[[int, int], None] | None = None
+) -> list[any]:
+    """
+    Apply an async function to every input with at most `concurrency` calls in flight.
+
+    Args:
+        afn: Async function called once per input, e.g. a wrapper around client.acall()
+        inputs: Inputs to map over
+        concurrency: Maximum number of concurrent calls
+        retries: Retries per input for transient errors (rate limits, timeouts, 5xx)
+        backoff: Base of the exponential backoff between retries, in seconds
+        on_progress: Optional callback invoked as on_progress(done, total) after each input
+
+    Returns:
+        Results aligned with inputs. An input that still fails after its retries
+        holds the raised exception instead, as with asyncio.gather(return_exceptions=True).
+    """
+    inputs = list(inputs)
+    results = [None] * len(inputs)
+    pending = iter(enumerate(inputs))
+    done = 0
+
+    async def worker() -> None:
+        nonlocal done
+        # Workers share one iterator, so only `concurrency` tasks ever exist
+        for index, item in pending:
+            try:
+                results[index] = await retry_async(lambda: afn(item), retries, backoff)
+            except Exception as exc:
+                results[index] = exc
+            done += 1
+            if on_progress:
+                on_progress(done, len(inputs))
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, len(inputs)))))
+    return results
+
+
+class AdaptiveSemaphore:
+    """Semaphore whose capacity can be resized while slots are held."""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._in_use = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        while self._in_use >= self.capacity:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Pass a wake-up we can no longer use on to the next waiter
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()
+                raise
+        self._in_use += 1
+
+    def release(self) -> None:
+        self._in_use -= 1
+        self._wake()
+
+    def resize(self, capacity: int) -> None:
+        """Change the capacity; shrinking takes effect as held slots are released."""
+        self.capacity = max(1, capacity)
+        self._wake()
+
+    def _wake(self) -> None:
+        free = self.capacity - self._in_use
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    async def __aenter__(self) -> "AdaptiveSemaphore":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> bool:
+        self.release()
+        return False
+
+
+class AIMDController:
+    """
+    Additive-increase / multiplicative-decrease concurrency control for one provider.
+    
+    Use as an async context manager around each call, then report the outcome
+    with update(). Concurrency grows by `increase` per call while the recent
+    average latency stays within `target_latency`, and is multiplied by
+    `decrease` on slower calls or transient errors. After `breaker_threshold`
+    consecutive 429s the breaker opens and new calls wait out the provider's
+    Retry-After (or `breaker_cooldown` seconds).
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 50,
+        target_latency: float = 120.0,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+        window: int = 20,
+        breaker_threshold: int = 5,
+        breaker_cooldown: float = 30.0
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.increase = increase
+        self.decrease = decrease
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.concurrency = float(min(max(initial, minimum), maximum))
+        self.semaphore = AdaptiveSemaphore(int(self.concurrency))
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._consecutive_rate_limits = 0
+        self._open_until = 0.0
+
+    def update(self, latency: float | None, error: BaseException | None = None) -> None:
+        """Record one call's latency or error and resize the concurrency window."""
+        if error is not None:
+            # Permanent errors (bad requests, parse failures) say nothing about load
+            if not is_transient_error(error):
+                return
+            self.concurrency *= self.decrease
+            if getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429:
+                self._consecutive_rate_limits += 1
+                if self._consecutive_rate_limits >= self.breaker_threshold:
+                    self._open_until = time.monotonic() + _retry_after(error, self.breaker_cooldown)
+                    self._consecutive_rate_limits = 0
+        else:
+            self._consecutive_rate_limits = 0
+            self._latencies.append(latency)
+            if statistics.fmean(self._latencies) <= self.target_latency:
+                self.concurrency += self.increase
+            else:
+                self.concurrency *= self.decrease
+
+        self.concurrency = min(max(self.concurrency, self.minimum), self.maximum)
+        self.semaphore.resize(int(self.concurrency))
+
+    async def __aenter__(self) -> "AIMDController":
+        delay = self._open_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await self.semaphore.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> bool:
+        self.semaphore.release()
+        return False
+
+
+def _retry_after(error: BaseException, default: float) -> float:
+    """Read a Retry-After delay in seconds from an SDK error's response, if present."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", default))
+    except (TypeError, ValueError):
+        return default
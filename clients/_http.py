@@ -0,0 +1,76 @@
+"""
+Shared HTTP connection pools for the LLM clients.
+
+Every SDK client is handed one of these pools instead of building its own,
+so TCP and TLS sessions are reused across providers, client instances and
+calls. An async pool only works on the event loop that opened its
+connections, so async pools are kept per running loop and each experiment
+run gets its own. HTTP/2 is negotiated where the provider supports it, multiplexing
+concurrent requests over a handful of connections instead of one each.
+"""
+
+import asyncio
+import weakref
+from typing import Callable, Generic, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+# Connection pool sizing - with HTTP/2 each connection carries many streams,
+# so a modest pool covers bounded fan-out, with idle connections kept warm
+# between evaluation batches
+HTTP_LIMITS = httpx.Limits(
+    max_connections=256,
+    max_keepalive_connections=128,
+    keepalive_expiry=60,
+)
+
+# Reasoning models can take several minutes before the first response byte,
+# so the read timeout stays at the SDK default of 10 minutes
+HTTP_TIMEOUT = httpx.Timeout(connect=10, read=600, write=30, pool=5)
+
+SHARED_SYNC_CLIENT = httpx.Client(
+    limits=HTTP_LIMITS,
+    timeout=HTTP_TIMEOUT,
+    follow_redirects=True,
+    http2=True,
+)
+
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def shared_async_client() -> httpx.AsyncClient:
+    """Return the async pool of the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None:
+        client = _ASYNC_CLIENTS[loop] = httpx.AsyncClient(
+            limits=HTTP_LIMITS,
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,
+            http2=True,
+        )
+    return client
+
+
+async def close_shared_async_client() -> None:
+    """Close the running event loop's async pool, if one was opened."""
+    client = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+class PerLoopClient(Generic[T]):
+    """Async SDK client built on the running loop's shared pool, rebuilt when the loop changes."""
+
+    def __init__(self, factory: Callable[[httpx.AsyncClient], T]):
+        self._factory = factory
+        self._pool: httpx.AsyncClient | None = None
+        self._client: T | None = None
+
+    def get(self) -> T:
+        pool = shared_async_client()
+        if pool is not self._pool:
+            self._pool, self._client = pool, self._factory(pool)
+        return self._client
@@ -0,0 +1,208 @@
+"""
+Client-side rate limiting for the async LLM call paths.
+
+AIOBurst lets up to `limit` requests through immediately, then holds further
+requests until the oldest entry leaves the rolling `period` window. Stack
+several limiters with LimiterStack for APIs that enforce both per-second and
+per-minute caps.
+
+ProviderRateLimiter complements these fixed budgets with the provider's own
+view: it reads the rate limit headers on every response and only holds
+requests when the remaining capacity runs low or a Retry-After arrives.
+
+Providers also cap tokens per minute, so TokenBucket bills an estimated token
+count per request. Buckets are shared per (provider, model) through
+token_bucket(), matching how the limits are enforced server-side.
+"""
+
+import asyncio
+import re
+import time
+from collections import deque
+from datetime import datetime
+from typing import Mapping
+
+
+class AIOBurst:
+    """Sliding-window limiter allowing at most `limit` entries per `period` seconds."""
+
+    def __init__(self, limit: int | None, period: float = 60.0):
+        self.limit = limit
+        self.period = period
+        self._entries: deque[float] = deque()
+
+    @classmethod
+    def create(cls, limit: int | None, period: float = 60.0) -> "AIOBurst":
+        """Create a limiter; a `limit` of None lets every request through."""
+        return cls(limit, period)
+
+    async def acquire(self) -> None:
+        """Wait until the window has room, then record one entry."""
+        if self.limit is None:
+            return
+
+        while True:
+            now = time.monotonic()
+            while self._entries and now - self._entries[0] >= self.period:
+                self._entries.popleft()
+
+            # No await between the check and the append, so concurrent tasks
+            # on the event loop cannot both take the last slot
+            if len(self._entries) < self.limit:
+                self._entries.append(now)
+                return
+
+            await asyncio.sleep(self.period - (now - self._entries[0]))
+
+    async def __aenter__(self) -> "AIOBurst":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> bool:
+        return False
+
+
+class LimiterStack:
+    """Acquire several limiters in order, e.g. a per-second and a per-minute cap."""
+
+    def __init__(self, *limiters: "AIOBurst | ProviderRateLimiter"):
+        self.limiters = limiters
+
+    async def __aenter__(self) -> "LimiterStack":
+        for limiter in self.limiters:
+            await limiter.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> bool:
+        return False
+
+
+class ProviderRateLimiter:
+    """
+    Block requests based on the rate limit headers returned by the provider.
+    
+    Understands the OpenAI-style `x-ratelimit-*` headers (also sent by the
+    OpenAI-compatible APIs), Anthropic's `anthropic-ratelimit-*` headers and
+    `retry-after`. Requests pass freely until a header reports that less than
+    `threshold` of a limit remains, then wait for that limit's reset.
+    """
+
+    # (remaining, limit, reset) header triples, per provider naming scheme
+    HEADER_TRIPLES = [
+        (f"x-ratelimit-remaining-{kind}", f"x-ratelimit-limit-{kind}", f"x-ratelimit-reset-{kind}")
+        for kind in ("requests", "tokens")
+    ] + [
+        (f"anthropic-ratelimit-{kind}-remaining", f"anthropic-ratelimit-{kind}-limit", f"anthropic-ratelimit-{kind}-reset")
+        for kind in ("requests", "tokens", "input-tokens", "output-tokens")
+    ]
+
+    def __init__(self, threshold: float = 0.1):
+        self.threshold = threshold
+        self._blocked_until = 0.0
+
+    async def acquire(self) -> None:
+        """Wait while the provider has reported its limits as exhausted."""
+        delay = self._blocked_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def update_from_headers(self, headers: Mapping[str, str] | None) -> None:
+        """Record the rate limit state reported by one response's headers."""
+        if not headers:
+            return
+
+        now = time.monotonic()
+        waits = []
+
+        retry_after = headers.get("retry-after")
+        if retry_after is not None:
+            waits.append(_parse_seconds(retry_after))
+
+        for remaining_name, limit_name, reset_name in self.HEADER_TRIPLES:
+            remaining, limit = headers.get(remaining_name), headers.get(limit_name)
+            if remaining is None or limit is None:
+                continue
+            try:
+                if int(limit) > 0 and int(remaining) / int(limit) < self.threshold:
+                    waits.append(_parse_seconds(headers.get(reset_name, "1")))
+            except ValueError:
+                continue
+
+        if waits:
+            self._blocked_until = max(self._blocked_until, now + max(waits))
+
+
+def _parse_seconds(value: str) -> float:
+    """Parse a reset header: seconds ("12"), a duration ("6m0s", "20ms") or an RFC 3339 timestamp."""
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if parts and "".join(number + unit for number, unit in parts) == value:
+        scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+        return sum(float(number) * scale[unit] for number, unit in parts)
+
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return max(reset_at.timestamp() - time.time(), 0.0)
+    except ValueError:
+        return 1.0
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `tpm` tokens per minute, holding at most `tpm`."""
+
+    def __init__(self, tpm: int | None):
+        self.tpm = tpm
+        self._tokens = float(tpm or 0)
+        self._updated = time.monotonic()
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until `tokens` are available, then take them; a `tpm` of None never waits."""
+        if self.tpm is None:
+            return
+
+        # A request larger than the whole budget waits for a full bucket rather than forever
+        tokens = min(tokens, self.tpm)
+        rate = self.tpm / 60.0
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.tpm, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return
+
+            await asyncio.sleep((tokens - self._tokens) / rate)
+
+
+_TOKEN_BUCKETS: dict[tuple[str, str], TokenBucket] = {}
+
+
+def token_bucket(provider: str, model: str, tpm: int | None) -> TokenBucket:
+    """Return the bucket shared by every client calling `model` on `provider`; the first `tpm` seen sets its size."""
+    key = (provider, model)
+    if key not in _TOKEN_BUCKETS:
+        _TOKEN_BUCKETS[key] = TokenBucket(tpm)
+    return _TOKEN_BUCKETS[key]
+
+
+def estimate_tokens(
+    messages: list[dict[str, any]],
+    system: str | list[dict[str, any]] | None = None,
+    max_tokens: int | None = None
+) -> int:
+    """
+    Estimate the tokens a request bills against TPM limits.
+    
+    Uses the ~4 characters per token rule of thumb for prompt text, plus the
+    requested completion budget.
+    """
+    chars = len(system) if isinstance(system, str) else len(str(system or ""))
+    for message in messages:
+        content = message.get("content")
+        chars += len(content) if isinstance(content, str) else len(str(content or ""))
+    return chars // 4 + (max_tokens or 0)
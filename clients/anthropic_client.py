@@ -1,16 +1,41 @@
+import asyncio
+import time
 import anthropic
 import os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from ._cache import acached_call, cache_enabled, cached_call
+from ._http import SHARED_SYNC_CLIENT, PerLoopClient
+from ._limiter import AIOBurst, LimiterStack, ProviderRateLimiter, estimate_tokens, token_bucket
 
 class AnthropicClient:
     """Utility class for accessing different Anthropic LLM models."""
     
-    def __init__(self, api_key: str | None = None):
-        """Initialize the Anthropic client."""
-        self.client = anthropic.Anthropic(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str | None = None,
+        rpm: int | None = 4000,
+        rps: int | None = None,
+        tpm: int | None = None
+    ):
+        """
+        Initialize the Anthropic client.
+        
+        Args:
+            rpm: Requests per minute allowed through acall() (None for no limit)
+            rps: Optional requests per second cap, stacked on top of rpm
+            tpm: Optional tokens per minute cap per model, shared by every client instance
+        """
+        self.client = anthropic.Anthropic(api_key=api_key, http_client=SHARED_SYNC_CLIENT)
+        self._aclient = PerLoopClient(lambda http_client: anthropic.AsyncAnthropic(api_key=api_key, http_client=http_client))
+        self._rate_limiter = ProviderRateLimiter()
+        self._limiter = LimiterStack(
+            AIOBurst.create(rps, period=1.0), AIOBurst.create(rpm, period=60.0), self._rate_limiter
+        )
+        self.tpm = tpm
+
+    @property
+    def aclient(self) -> anthropic.AsyncAnthropic:
+        """Async SDK client on the running event loop's connection pool."""
+        return self._aclient.get()
     
     def call(
         self, 
@@ -19,7 +44,7 @@ class AnthropicClient:
         max_tokens: int = 1024,
         temperature: float = 1.0,
         tools: list[dict[str, any]] | None = None,
-        system: str | None = None
+        system: str | list[dict[str, any]] | None = None
     ) -> anthropic.types.Message:
         """
         General method for calling any Anthropic model.
@@ -30,11 +55,110 @@ class AnthropicClient:
             max_tokens: Maximum tokens to generate
             temperature: Temperature for randomness (0.0-1.0)
             tools: Optional list of tools for function calling
-            system: Optional system prompt
+            system: Optional system prompt, as a string or as text blocks (e.g. with cache_control)
             
         Returns:
             Anthropic message response
         """
+        kwargs = self._build_kwargs(model, messages, max_tokens, temperature, tools, system)
+        if cache_enabled(temperature):
+            return cached_call(
+                "anthropic", kwargs, lambda: self.client.messages.create(**kwargs),
+                anthropic.types.Message
+            )
+        return self.client.messages.create(**kwargs)
+
+    async def acall(
+        self, 
+        model: str,
+        messages: list[dict[str, str]], 
+        max_tokens: int = 1024,
+        temperature: float = 1.0,
+        tools: list[dict[str, any]] | None = None,
+        system: str | list[dict[str, any]] | None = None
+    ) -> anthropic.types.Message:
+        """
+        Async variant of call(), for fanning out many requests with asyncio.
+        
+        Takes the same arguments as call().
+        """
+        kwargs = self._build_kwargs(model, messages, max_tokens, temperature, tools, system)
+        if cache_enabled(temperature):
+            return await acached_call(
+                "anthropic", kwargs, lambda: self._acreate(kwargs),
+                anthropic.types.Message
+            )
+        return await self._acreate(kwargs)
+
+    async def _acreate(self, kwargs: dict[str, any]) -> anthropic.types.Message:
+        """Send one request through the async client, paced by the request and token limiters."""
+        tokens = estimate_tokens(kwargs["messages"], kwargs.get("system"), kwargs.get("max_tokens"))
+        async with self._limiter:
+            await token_bucket("anthropic", kwargs["model"], self.tpm).acquire(tokens)
+            try:
+                raw = await self.aclient.messages.with_raw_response.create(**kwargs)
+            except anthropic.APIStatusError as e:
+                self._rate_limiter.update_from_headers(e.response.headers)
+                raise
+            self._rate_limiter.update_from_headers(raw.headers)
+            return raw.parse()
+
+    def submit_batch(self, requests: list[dict[str, any]]) -> str:
+        """
+        Submit message requests through the Message Batches API (50% cheaper).
+        
+        Args:
+            requests: List of request dictionaries, each with a unique "custom_id"
+                (letters, digits, "-" and "_" only) plus the same keyword
+                arguments accepted by call()
+            
+        Returns:
+            ID of the created batch, to pass to poll_batch()
+        """
+        batch_requests = []
+        for request in requests:
+            params = dict(request)
+            custom_id = params.pop("custom_id")
+            batch_requests.append({"custom_id": custom_id, "params": self._build_kwargs(**params)})
+        
+        batch = self.client.messages.batches.create(requests=batch_requests)
+        return batch.id
+
+    def poll_batch(
+        self, 
+        batch_id: str, 
+        poll_interval: float = 30.0
+    ) -> dict[str, anthropic.types.Message]:
+        """
+        Block until a batch finishes and return its messages keyed by custom_id.
+        
+        Requests that errored, expired or were canceled are left out of the result.
+        """
+        batch = self.client.messages.batches.retrieve(batch_id)
+        while batch.processing_status != "ended":
+            time.sleep(poll_interval)
+            batch = self.client.messages.batches.retrieve(batch_id)
+        
+        results = {}
+        for item in self.client.messages.batches.results(batch_id):
+            if item.result.type == "succeeded":
+                results[item.custom_id] = item.result.message
+        return results
+
+    async def warmup(self, concurrency: int = 1) -> None:
+        """Open `concurrency` pooled connections ahead of the first real call."""
+        await asyncio.gather(*(self.aclient.models.list() for _ in range(concurrency)))
+
+    def _build_kwargs(
+        self,
+        model: str,
+        messages: list[dict[str, str]],
+        max_tokens: int = 1024,
+        temperature: float = 1.0,
+        tools: list[dict[str, any]] | None = None,
+        system: str | list[dict[str, any]] | None = None
+    ) -> dict[str, any]:
+        """Build the messages request arguments shared by call() and acall()."""
         kwargs = {
             "model": model,
             "max_tokens": max_tokens,
@@ -47,7 +171,7 @@ class AnthropicClient:
         if system:
             kwargs["system"] = system
             
-        return self.client.messages.create(**kwargs)
+        return kwargs
 
 # Example usage
 if __name__ == "__main__":
@@ -1,20 +1,48 @@
+import asyncio
 import openai
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 import os
-from dotenv import load_dotenv
+from ._cache import acached_call, cache_enabled, cached_call
+from ._http import SHARED_SYNC_CLIENT, PerLoopClient
+from ._limiter import AIOBurst, LimiterStack, ProviderRateLimiter
 
-# Load environment variables
-load_dotenv()
+# Read once at import; the package loads .env before importing client modules
+_DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
 
 class DeepSeekClient:
     """Utility class for accessing DeepSeek LLM models."""
     
-    def __init__(self):
-        """Initialize the DeepSeek client."""
+    def __init__(self, rpm: int | None = None, rps: int | None = None):
+        """
+        Initialize the DeepSeek client.
+        
+        Args:
+            rpm: Requests per minute allowed through acall() (None for no limit)
+            rps: Optional requests per second cap, stacked on top of rpm
+        """
+        if not _DEEPSEEK_API_KEY:
+            raise RuntimeError("DEEPSEEK_API_KEY is not set")
+        
         self.client = OpenAI(
-            api_key=os.getenv("DEEPSEEK_API_KEY"),
-            base_url="https://api.deepseek.com"
+            api_key=_DEEPSEEK_API_KEY,
+            base_url="https://api.deepseek.com",
+            http_client=SHARED_SYNC_CLIENT
+        )
+        self._aclient = PerLoopClient(lambda http_client: AsyncOpenAI(
+            api_key=_DEEPSEEK_API_KEY,
+            base_url="https://api.deepseek.com",
+            http_client=http_client
+        ))
+        self._rate_limiter = ProviderRateLimiter()
+        self._limiter = LimiterStack(
+            AIOBurst.create(rps, period=1.0), AIOBurst.create(rpm, period=60.0), self._rate_limiter
         )
+        self._system_messages: dict[str, dict[str, str]] = {}
+
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        """Async SDK client on the running event loop's connection pool."""
+        return self._aclient.get()
     
     def call(
         self, 
@@ -43,12 +71,75 @@ class DeepSeekClient:
         Returns:
             OpenAI chat completion response
         """
+        kwargs = self._build_kwargs(
+            model, messages, max_tokens, temperature, tools, tool_choice, response_format, system
+        )
+        if cache_enabled(temperature):
+            return cached_call(
+                "deepseek", kwargs, lambda: self.client.chat.completions.create(**kwargs),
+                openai.types.chat.ChatCompletion
+            )
+        return self.client.chat.completions.create(**kwargs)
+
+    async def acall(
+        self, 
+        model: str = "deepseek-reasoner",
+        messages: list[dict[str, str]] = None, 
+        max_tokens: int | None = None,
+        temperature: float = 1.0,
+        tools: list[dict[str, any]] | None = None,
+        tool_choice: str | None = None,
+        response_format: dict[str, str] | None = None,
+        system: str | None = None
+    ) -> openai.types.chat.ChatCompletion:
+        """
+        Async variant of call(), for fanning out many requests with asyncio.
+        
+        Takes the same arguments as call().
+        """
+        kwargs = self._build_kwargs(
+            model, messages, max_tokens, temperature, tools, tool_choice, response_format, system
+        )
+        if cache_enabled(temperature):
+            return await acached_call(
+                "deepseek", kwargs, lambda: self._acreate(kwargs),
+                openai.types.chat.ChatCompletion
+            )
+        return await self._acreate(kwargs)
+
+    async def _acreate(self, kwargs: dict[str, any]) -> openai.types.chat.ChatCompletion:
+        """Send one request through the async client, paced by the rate limiters."""
+        async with self._limiter:
+            try:
+                raw = await self.aclient.chat.completions.with_raw_response.create(**kwargs)
+            except openai.APIStatusError as e:
+                self._rate_limiter.update_from_headers(e.response.headers)
+                raise
+            self._rate_limiter.update_from_headers(raw.headers)
+            return raw.parse()
+
+    async def warmup(self, concurrency: int = 1) -> None:
+        """Open `concurrency` pooled connections ahead of the first real call."""
+        await asyncio.gather(*(self.aclient.models.list() for _ in range(concurrency)))
+
+    def _build_kwargs(
+        self,
+        model: str,
+        messages: list[dict[str, str]] | None,
+        max_tokens: int | None,
+        temperature: float,
+        tools: list[dict[str, any]] | None,
+        tool_choice: str | None,
+        response_format: dict[str, str] | None,
+        system: str | None
+    ) -> dict[str, any]:
+        """Build the chat completions request arguments shared by call() and acall()."""
         if messages is None:
             messages = []
             
         # Add system message if provided
         if system:
-            messages = [{"role": "system", "content": system}] + messages
+            messages = [self._system_message(system), *messages]
         
         kwargs = {
             "model": model,
@@ -65,7 +156,14 @@ class DeepSeekClient:
         if response_format:
             kwargs["response_format"] = response_format
             
-        return self.client.chat.completions.create(**kwargs)
+        return kwargs
+
+    def _system_message(self, system: str) -> dict[str, str]:
+        """Return the system message for `system`, built once and reused across calls."""
+        message = self._system_messages.get(system)
+        if message is None:
+            message = self._system_messages[system] = {"role": "system", "content": system}
+        return message
 
 
 # Example usage
@@ -1,25 +1,45 @@
-import requests
-import json
+import asyncio
+import httpx
+import orjson
 import os
-# Load environment variables
-from dotenv import load_dotenv
 
+# Read once at import; the package loads .env before importing client modules
+_FINANCIAL_DATASETS_API_KEY = os.getenv('FINANCIAL_DATASETS_API_KEY')
 
-load_dotenv()
 
 class FinancialDatasetsClient:
 
   def __init__(self):
     self._base_url = "https://api.financialdatasets.ai"
-    self._headers = {"X-API-KEY": os.getenv('FINANCIAL_DATASETS_API_KEY')}
+    if not _FINANCIAL_DATASETS_API_KEY:
+      raise RuntimeError("FINANCIAL_DATASETS_API_KEY is not set")
+    self._headers = {"X-API-KEY": _FINANCIAL_DATASETS_API_KEY}
+    # One pooled session so Keep-Alive connections are reused across ticker lookups
+    self._session = httpx.Client(
+        headers=self._headers,
+        timeout=30,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=32),
+    )
+
+  def close(self) -> None:
+    """Close the pooled HTTP session."""
+    self._session.close()
+
+  def __enter__(self) -> "FinancialDatasetsClient":
+    return self
+
+  def __exit__(self, *exc_info) -> None:
+    self.close()
 
 
   def search(
       self, 
       filters: list[dict], 
       label: str, 
-      period: str = "ttm",
+      *,
       limit: int = 5, 
+      period: str = "ttm",
   ) -> list[dict[str, str]]:
     url = f"{self._base_url}/financials/search"
     body = {
@@ -27,17 +47,63 @@ class FinancialDatasetsClient:
         "limit": limit,
         "filters": filters
     }
-    response = requests.request("POST", url, json=body, headers=self._headers)
+    response = self._session.post(url, json=body)
     response.raise_for_status()
-    results = response.json().get("search_results", [])
-    return [{"ticker": r["ticker"], "label": label} for r in results] 
+    return _search_results(response, label)
+
+  async def asearch_many(
+      self,
+      searches: list[dict],
+  ) -> list[list[dict[str, str]]]:
+    """Run several screens concurrently, aligned with `searches`; each entry holds search() keyword arguments."""
+    url = f"{self._base_url}/financials/search"
+
+    async with self._async_session() as aclient:
+      async def fetch(filters: list[dict], label: str, limit: int = 5, period: str = "ttm") -> list[dict[str, str]]:
+        response = await aclient.post(url, json={"period": period, "limit": limit, "filters": filters})
+        response.raise_for_status()
+        return _search_results(response, label)
+
+      return await asyncio.gather(*(fetch(**search) for search in searches))
 
   def get_financial_metrics(
       self,
       ticker: str,
   ) -> dict[str, list]:
-    url = f"{self._base_url}/financial-metrics/snapshot?ticker={ticker}"
-    response = requests.request("GET", url, headers=self._headers)
+    url = f"{self._base_url}/financial-metrics/snapshot"
+    response = self._session.get(url, params={"ticker": ticker})
     response.raise_for_status()
-    snapshot = response.json().get("snapshot", {})
-    return snapshot
\ No newline at end of file
+    snapshot = orjson.loads(response.content).get("snapshot", {})
+    return snapshot
+
+  async def aget_financial_metrics_many(
+      self,
+      tickers: list[str],
+      concurrency: int = 32,
+  ) -> list[dict[str, list]]:
+    """Fetch financial metrics snapshots for many tickers concurrently, aligned with `tickers`."""
+    url = f"{self._base_url}/financial-metrics/snapshot"
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with self._async_session() as aclient:
+      async def fetch(ticker: str) -> dict[str, list]:
+        async with semaphore:
+          response = await aclient.get(url, params={"ticker": ticker})
+        response.raise_for_status()
+        return orjson.loads(response.content).get("snapshot", {})
+
+      return await asyncio.gather(*(fetch(ticker) for ticker in tickers))
+
+  def _async_session(self) -> httpx.AsyncClient:
+    # Opened per bulk fetch since an async pool is bound to the running event loop
+    return httpx.AsyncClient(
+        headers=self._headers,
+        timeout=30,
+        http2=True,
+        limits=httpx.Limits(max_connections=64),
+    )
+
+
+def _search_results(response: httpx.Response, label: str) -> list[dict[str, str]]:
+  results = orjson.loads(response.content).get("search_results", [])
+  return [{"ticker": r["ticker"], "label": label} for r in results]
@@ -1,20 +1,50 @@
+import asyncio
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 import os
-from dotenv import load_dotenv
+from ._cache import acached_call, cache_enabled, cached_call, request_hash
+from ._http import HTTP_LIMITS, PerLoopClient
+from ._limiter import AIOBurst, LimiterStack, ProviderRateLimiter
 
-# Load environment variables
-load_dotenv()
+# Chat roles mapped to Gemini content roles
+GEMINI_ROLES = {"user": "user", "assistant": "model"}
+
+# Read once at import; the package loads .env before importing client modules
+_GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
 class GeminiClient:
     """Utility class for accessing different Google Gemini LLM models."""
     
-    def __init__(self, api_key: str | None = None):
-        """Initialize the Gemini client."""
-        if api_key:
-            self.client = genai.Client(api_key=api_key)
-        else:
-            self.client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+    def __init__(self, api_key: str | None = None, rpm: int | None = 150, rps: int | None = None):
+        """
+        Initialize the Gemini client.
+        
+        Args:
+            rpm: Requests per minute allowed through acall() (None for no limit)
+            rps: Optional requests per second cap, stacked on top of rpm
+        """
+        # The Gemini SDK builds its own httpx pools, so only the pool settings are shared
+        http_options = types.HttpOptions(
+            client_args={"limits": HTTP_LIMITS, "http2": True},
+            async_client_args={"limits": HTTP_LIMITS, "http2": True},
+        )
+        api_key = api_key or _GOOGLE_API_KEY
+        if not api_key:
+            raise RuntimeError("GOOGLE_API_KEY is not set")
+        self.client = genai.Client(api_key=api_key, http_options=http_options)
+        # This SDK cannot be handed the shared async pool and opens its own once per
+        # Client, bound to the first loop that uses it; build one Client per event loop
+        self._aclient = PerLoopClient(lambda _pool: genai.Client(api_key=api_key, http_options=http_options).aio)
+        self._rate_limiter = ProviderRateLimiter()
+        self._limiter = LimiterStack(
+            AIOBurst.create(rps, period=1.0), AIOBurst.create(rpm, period=60.0), self._rate_limiter
+        )
+        self._configs: dict[tuple, types.GenerateContentConfig] = {}
+
+    @property
+    def aclient(self) -> "genai.client.AsyncClient":
+        """Async SDK client for the running event loop."""
+        return self._aclient.get()
     
     def call(
         self, 
@@ -39,23 +69,105 @@ class GeminiClient:
         Returns:
             Gemini generate content response
         """
-        # Convert messages to content format for Gemini
-        contents = []
-        
-        # Add system message if provided
-        if system:
-            contents.append(system)
+        contents, config = self._build_request(messages, max_tokens, temperature, tools, system)
+        generate = lambda: self.client.models.generate_content(
+            model=model,
+            contents=contents,
+            config=config,
+        )
+        if cache_enabled(temperature):
+            request = {
+                "model": model,
+                "contents": [content.model_dump(exclude_none=True) for content in contents],
+                "config": config.model_dump(exclude_none=True),
+            }
+            return cached_call("gemini", request, generate, types.GenerateContentResponse, validate=True)
+        return generate()
+
+    async def acall(
+        self, 
+        model: str,
+        messages: list[dict[str, str]], 
+        max_tokens: int | None = None,
+        temperature: float = 1.0,
+        tools: list[dict[str, any]] | None = None,
+        system: str | None = None
+    ) -> any:
+        """
+        Async variant of call(), for fanning out many requests with asyncio.
         
-        # Convert messages to Gemini format
-        for message in messages:
-            if message["role"] == "user":
-                contents.append(message["content"])
-            elif message["role"] == "assistant":
-                contents.append(message["content"])
+        Takes the same arguments as call().
+        """
+        contents, config = self._build_request(messages, max_tokens, temperature, tools, system)
+        generate = lambda: self._agenerate(model, contents, config)
+        if cache_enabled(temperature):
+            request = {
+                "model": model,
+                "contents": [content.model_dump(exclude_none=True) for content in contents],
+                "config": config.model_dump(exclude_none=True),
+            }
+            return await acached_call("gemini", request, generate, types.GenerateContentResponse, validate=True)
+        return await generate()
+
+    async def _agenerate(
+        self,
+        model: str,
+        contents: list[types.Content],
+        config: types.GenerateContentConfig
+    ) -> types.GenerateContentResponse:
+        """Send one request through the async client, paced by the rate limiters."""
+        async with self._limiter:
+            try:
+                response = await self.aclient.models.generate_content(
+                    model=model,
+                    contents=contents,
+                    config=config,
+                )
+            except errors.APIError as e:
+                self._rate_limiter.update_from_headers(getattr(e.response, "headers", None))
+                raise
+            if response.sdk_http_response:
+                self._rate_limiter.update_from_headers(response.sdk_http_response.headers)
+            return response
+
+    async def warmup(self, concurrency: int = 1) -> None:
+        """Open `concurrency` pooled connections ahead of the first real call."""
+        await asyncio.gather(*(self.aclient.models.list() for _ in range(concurrency)))
+
+    def _build_request(
+        self,
+        messages: list[dict[str, str]],
+        max_tokens: int | None,
+        temperature: float,
+        tools: list[dict[str, any]] | None,
+        system: str | None
+    ) -> tuple[list[types.Content], types.GenerateContentConfig]:
+        """Build the contents and generation config shared by call() and acall()."""
+        # Convert messages to role-tagged contents, merging consecutive turns of the
+        # same role the way the SDK groups bare strings
+        contents = []
+        turns = [("user", system)] if system else []
+        turns += [(GEMINI_ROLES[m["role"]], m["content"]) for m in messages if m["role"] in GEMINI_ROLES]
+        for role, text in turns:
+            part = types.Part.from_text(text=text)
+            if contents and contents[-1].role == role:
+                contents[-1].parts.append(part)
+            else:
+                contents.append(types.Content(role=role, parts=[part]))
         
-        # If there's only one message, use it directly as string
-        if len(contents) == 1:
-            contents = contents[0]
+        return contents, self._config(max_tokens, temperature, tools)
+
+    def _config(
+        self,
+        max_tokens: int | None,
+        temperature: float,
+        tools: list[dict[str, any]] | None
+    ) -> types.GenerateContentConfig:
+        """Return the generation config for these parameters, built once and reused across calls."""
+        key = (temperature, max_tokens, request_hash({"tools": tools}) if tools else None)
+        config = self._configs.get(key)
+        if config is not None:
+            return config
         
         # Configure generation parameters
         config_params = {
@@ -67,21 +179,11 @@ class GeminiClient:
         
         # Add tools if provided
         if tools:
-            # Convert tools to Gemini format
-            function_declarations = []
-            for tool in tools:
-                function_declarations.append(tool)
-            
-            tool_config = types.Tool(function_declarations=function_declarations)
+            tool_config = types.Tool(function_declarations=list(tools))
             config_params["tools"] = [tool_config]
         
-        config = types.GenerateContentConfig(**config_params)
-        
-        return self.client.models.generate_content(
-            model=model,
-            contents=contents,
-            config=config,
-        )
+        config = self._configs[key] = types.GenerateContentConfig(**config_params)
+        return config
 
 
 # Example usage
@@ -1,17 +1,44 @@
+import asyncio
+import time
 import openai
-from openai import OpenAI
+import orjson
+from openai import AsyncOpenAI, OpenAI
 import os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from ._cache import acached_call, cache_enabled, cached_call
+from ._http import SHARED_SYNC_CLIENT, PerLoopClient
+from ._limiter import AIOBurst, LimiterStack, ProviderRateLimiter, estimate_tokens, token_bucket
 
 class OpenAIClient:
     """Utility class for accessing different OpenAI LLM models."""
     
-    def __init__(self, api_key: str | None = None):
-        """Initialize the OpenAI client."""
-        self.client = OpenAI(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str | None = None,
+        rpm: int | None = 500,
+        rps: int | None = None,
+        tpm: int | None = None
+    ):
+        """
+        Initialize the OpenAI client.
+        
+        Args:
+            rpm: Requests per minute allowed through acall() (None for no limit)
+            rps: Optional requests per second cap, stacked on top of rpm
+            tpm: Optional tokens per minute cap per model, shared by every client instance
+        """
+        self.client = OpenAI(api_key=api_key, http_client=SHARED_SYNC_CLIENT)
+        self._aclient = PerLoopClient(lambda http_client: AsyncOpenAI(api_key=api_key, http_client=http_client))
+        self._rate_limiter = ProviderRateLimiter()
+        self._limiter = LimiterStack(
+            AIOBurst.create(rps, period=1.0), AIOBurst.create(rpm, period=60.0), self._rate_limiter
+        )
+        self.tpm = tpm
+        self._system_messages: dict[str, dict[str, str]] = {}
+
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        """Async SDK client on the running event loop's connection pool."""
+        return self._aclient.get()
     
     def call(
         self, 
@@ -40,9 +67,138 @@ class OpenAIClient:
         Returns:
             OpenAI chat completion response
         """
+        kwargs = self._build_kwargs(
+            model, messages, max_tokens, temperature, tools, tool_choice, response_format, system
+        )
+        if cache_enabled(temperature):
+            return cached_call(
+                "openai", kwargs, lambda: self.client.chat.completions.create(**kwargs),
+                openai.types.chat.ChatCompletion
+            )
+        return self.client.chat.completions.create(**kwargs)
+
+    async def acall(
+        self, 
+        model: str,
+        messages: list[dict[str, str]], 
+        max_tokens: int | None = None,
+        temperature: float = 1.0,
+        tools: list[dict[str, any]] | None = None,
+        tool_choice: str | None = None,
+        response_format: dict[str, str] | None = None,
+        system: str | None = None
+    ) -> openai.types.chat.ChatCompletion:
+        """
+        Async variant of call(), for fanning out many requests with asyncio.
+        
+        Takes the same arguments as call().
+        """
+        kwargs = self._build_kwargs(
+            model, messages, max_tokens, temperature, tools, tool_choice, response_format, system
+        )
+        if cache_enabled(temperature):
+            return await acached_call(
+                "openai", kwargs, lambda: self._acreate(kwargs),
+                openai.types.chat.ChatCompletion
+            )
+        return await self._acreate(kwargs)
+
+    async def _acreate(self, kwargs: dict[str, any]) -> openai.types.chat.ChatCompletion:
+        """Send one request through the async client, paced by the request and token limiters."""
+        tokens = estimate_tokens(kwargs["messages"], max_tokens=kwargs.get("max_tokens"))
+        async with self._limiter:
+            await token_bucket("openai", kwargs["model"], self.tpm).acquire(tokens)
+            try:
+                raw = await self.aclient.chat.completions.with_raw_response.create(**kwargs)
+            except openai.APIStatusError as e:
+                self._rate_limiter.update_from_headers(e.response.headers)
+                raise
+            self._rate_limiter.update_from_headers(raw.headers)
+            return raw.parse()
+
+    def submit_batch(self, requests: list[dict[str, any]]) -> str:
+        """
+        Submit chat completion requests through the Batch API (50% cheaper, 24h window).
+        
+        Args:
+            requests: List of request dictionaries, each with a unique "custom_id"
+                plus the same keyword arguments accepted by call()
+            
+        Returns:
+            ID of the created batch, to pass to poll_batch()
+        """
+        lines = []
+        for request in requests:
+            params = dict(request)
+            custom_id = params.pop("custom_id")
+            lines.append(orjson.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._build_kwargs(**params),
+            }))
+        
+        batch_file = self.client.files.create(
+            file=("batch.jsonl", b"\n".join(lines)),
+            purpose="batch",
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    def poll_batch(
+        self, 
+        batch_id: str, 
+        poll_interval: float = 30.0
+    ) -> dict[str, openai.types.chat.ChatCompletion]:
+        """
+        Block until a batch finishes and return its responses keyed by custom_id.
+        
+        Requests that failed inside the batch are left out of the result.
+        """
+        batch = self.client.batches.retrieve(batch_id)
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_interval)
+            batch = self.client.batches.retrieve(batch_id)
+        
+        if batch.status != "completed":
+            raise RuntimeError(f"OpenAI batch {batch_id} ended with status {batch.status}")
+        if not batch.output_file_id:
+            return {}
+        
+        results = {}
+        output = self.client.files.content(batch.output_file_id).content
+        for line in output.splitlines():
+            if not line:
+                continue
+            item = orjson.loads(line)
+            response = item.get("response") or {}
+            if response.get("status_code") == 200:
+                results[item["custom_id"]] = openai.types.chat.ChatCompletion.model_validate(response["body"])
+        return results
+
+    async def warmup(self, concurrency: int = 1) -> None:
+        """Open `concurrency` pooled connections ahead of the first real call."""
+        await asyncio.gather(*(self.aclient.models.list() for _ in range(concurrency)))
+
+    def _build_kwargs(
+        self,
+        model: str,
+        messages: list[dict[str, str]],
+        max_tokens: int | None = None,
+        temperature: float = 1.0,
+        tools: list[dict[str, any]] | None = None,
+        tool_choice: str | None = None,
+        response_format: dict[str, str] | None = None,
+        system: str | None = None
+    ) -> dict[str, any]:
+        """Build the chat completions request arguments shared by call() and acall()."""
         # Add system message if provided
         if system:
-            messages = [{"role": "system", "content": system}] + messages
+            messages = [self._system_message(system), *messages]
         
         kwargs = {
             "model": model,
@@ -59,7 +215,14 @@ class OpenAIClient:
         if response_format:
             kwargs["response_format"] = response_format
             
-        return self.client.chat.completions.create(**kwargs)
+        return kwargs
+
+    def _system_message(self, system: str) -> dict[str, str]:
+        """Return the system message for `system`, built once and reused across calls."""
+        message = self._system_messages.get(system)
+        if message is None:
+            message = self._system_messages[system] = {"role": "system", "content": system}
+        return message
 
 
 # Example usage
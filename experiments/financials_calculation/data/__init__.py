@@ -1,8 +1,9 @@
 # This file makes the directory a Python package
 import sys
-import os
+from pathlib import Path
 
-# Add project root to path to enable absolute imports
-project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+# Add project root to path to enable absolute imports; the guard keeps
+# repeated imports from adding duplicates
+project_root = str(Path(__file__).resolve().parents[3])
 if project_root not in sys.path:
-    sys.path.append(project_root) 
\ No newline at end of file
+    sys.path.insert(0, project_root)
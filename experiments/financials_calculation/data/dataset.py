@@ -5,16 +5,67 @@ This module provides the FinancialsCalculationDataset class for organizing and a
 financial data from SEC filings with XBRL facts for financial calculations.
 """
 
-import json
 import os
-from typing import Optional
+import sys
+from collections import defaultdict
+from functools import cached_property
+from typing import Iterable, Optional
+
+import orjson
 
 
 class FinancialsCalculationDataset:
     """Dataset container for financials calculation data."""
     
-    def __init__(self, companies: list[dict]):
-        self._companies = companies
+    def __init__(self, companies: Iterable[dict]):
+        self._companies: list[dict] = []
+        
+        # Lookup indexes, built in a single pass so queries don't rescan every company;
+        # accessors return copies, so callers can't modify an index through a result
+        self._by_ticker: dict[str, list[dict]] = defaultdict(list)
+        self._by_cik: dict[str, list[dict]] = defaultdict(list)
+        self._by_filing_type: dict[str, list[dict]] = defaultdict(list)
+        self._by_report_period: dict[str, list[dict]] = defaultdict(list)
+        self._companies_by_concept: dict[str, list[dict]] = defaultdict(list)
+        self._facts_by_concept: dict[str, list[int]] = defaultdict(list)
+        self._total_xbrl_facts = 0
+        
+        # Facts flattened into parallel columns; the concept index holds row positions
+        self._fact_rows: list[dict] = []
+        self._fact_concepts: list[str] = []
+        self._fact_company_idx: list[int] = []
+        # Indexes are filled as companies are consumed, so a streamed iterable
+        # is indexed in the same pass that materializes it
+        for company_idx, company in enumerate(companies):
+            self._companies.append(company)
+            self._ingest(company_idx, company)
+    
+    def _ingest(self, company_idx: int, company: dict) -> None:
+        """Add one company to the lookup indexes."""
+        # Intern heavily repeated strings so copies share one object and compare by identity
+        for field in ("ticker", "filing_type", "report_period"):
+            if isinstance(company.get(field), str):
+                company[field] = sys.intern(company[field])
+        
+        self._by_ticker[company.get("ticker")].append(company)
+        self._by_cik[company.get("cik")].append(company)
+        self._by_filing_type[company.get("filing_type")].append(company)
+        self._by_report_period[company.get("report_period")].append(company)
+        
+        xbrl_facts = company.get("xbrl_facts", [])
+        self._total_xbrl_facts += len(xbrl_facts)
+        for fact in xbrl_facts:
+            if "concept" in fact:
+                if isinstance(fact["concept"], str):
+                    fact["concept"] = sys.intern(fact["concept"])
+                self._facts_by_concept[fact["concept"]].append(len(self._fact_rows))
+                self._fact_rows.append(fact)
+                self._fact_concepts.append(fact["concept"])
+                self._fact_company_idx.append(company_idx)
+        
+        # Index each company once per concept, however many facts share it
+        for concept in {fact["concept"] for fact in xbrl_facts if "concept" in fact}:
+            self._companies_by_concept[concept].append(company)
     
     def get_companies(self) -> list[dict]:
         """Get all companies in the dataset."""
@@ -22,36 +73,29 @@ class FinancialsCalculationDataset:
     
     def get_companies_by_ticker(self, ticker: str) -> list[dict]:
         """Get companies with a specific ticker symbol."""
-        return [c for c in self._companies if c.get("ticker") == ticker]
+        return list(self._by_ticker.get(ticker, ()))
     
     def get_companies_by_filing_type(self, filing_type: str) -> list[dict]:
         """Get companies with a specific filing type (e.g., '10-Q', '10-K')."""
-        return [c for c in self._companies if c.get("filing_type") == filing_type]
+        return list(self._by_filing_type.get(filing_type, ()))
     
     def get_companies_by_report_period(self, report_period: str) -> list[dict]:
         """Get companies with a specific report period (e.g., '2025-06-30')."""
-        return [c for c in self._companies if c.get("report_period") == report_period]
+        return list(self._by_report_period.get(report_period, ()))
     
     def get_companies_with_xbrl_concept(self, concept: str) -> list[dict]:
         """Get companies that have a specific XBRL concept in their facts."""
-        companies_with_concept = []
-        for company in self._companies:
-            xbrl_facts = company.get("xbrl_facts", [])
-            if any(fact.get("concept") == concept for fact in xbrl_facts):
-                companies_with_concept.append(company)
-        return companies_with_concept
+        return list(self._companies_by_concept.get(concept, ()))
     
     def get_xbrl_facts_by_concept(self, concept: str) -> list[dict]:
         """Get all XBRL facts with a specific concept across all companies."""
         facts = []
-        for company in self._companies:
-            xbrl_facts = company.get("xbrl_facts", [])
-            for fact in xbrl_facts:
-                if fact.get("concept") == concept:
-                    fact_with_company = fact.copy()
-                    fact_with_company["ticker"] = company.get("ticker")
-                    fact_with_company["cik"] = company.get("cik")
-                    facts.append(fact_with_company)
+        for row in self._facts_by_concept.get(concept, []):
+            company = self._companies[self._fact_company_idx[row]]
+            fact_with_company = self._fact_rows[row].copy()
+            fact_with_company["ticker"] = company.get("ticker")
+            fact_with_company["cik"] = company.get("cik")
+            facts.append(fact_with_company)
         return facts
     
     def get_company_xbrl_facts(self, ticker: str = None, cik: str = None) -> list[dict]:
@@ -59,7 +103,7 @@ class FinancialsCalculationDataset:
         if ticker:
             companies = self.get_companies_by_ticker(ticker)
         elif cik:
-            companies = [c for c in self._companies if c.get("cik") == cik]
+            companies = self._by_cik.get(cik, [])
         else:
             return []
         
@@ -69,25 +113,35 @@ class FinancialsCalculationDataset:
     
     def get_all_xbrl_concepts(self) -> set[str]:
         """Get all unique XBRL concepts in the dataset."""
-        concepts = set()
-        for company in self._companies:
-            xbrl_facts = company.get("xbrl_facts", [])
-            for fact in xbrl_facts:
-                if "concept" in fact:
-                    concepts.add(fact["concept"])
-        return concepts
+        return set(self._all_xbrl_concepts)
     
     def get_all_tickers(self) -> set[str]:
         """Get all unique ticker symbols in the dataset."""
-        return {c.get("ticker") for c in self._companies if c.get("ticker")}
+        return set(self._all_tickers)
     
     def get_all_filing_types(self) -> set[str]:
         """Get all unique filing types in the dataset."""
-        return {c.get("filing_type") for c in self._companies if c.get("filing_type")}
+        return set(self._all_filing_types)
     
     def get_all_report_periods(self) -> set[str]:
         """Get all unique report periods in the dataset."""
-        return {c.get("report_period") for c in self._companies if c.get("report_period")}
+        return set(self._all_report_periods)
+    
+    @cached_property
+    def _all_xbrl_concepts(self) -> set[str]:
+        return set(self._fact_concepts)
+    
+    @cached_property
+    def _all_tickers(self) -> set[str]:
+        return {ticker for ticker in self._by_ticker if ticker}
+    
+    @cached_property
+    def _all_filing_types(self) -> set[str]:
+        return {filing_type for filing_type in self._by_filing_type if filing_type}
+    
+    @cached_property
+    def _all_report_periods(self) -> set[str]:
+        return {report_period for report_period in self._by_report_period if report_period}
     
     def size(self) -> int:
         """Get the total number of companies in the dataset."""
@@ -95,10 +149,7 @@ class FinancialsCalculationDataset:
     
     def total_xbrl_facts(self) -> int:
         """Get the total number of XBRL facts across all companies."""
-        total = 0
-        for company in self._companies:
-            total += len(company.get("xbrl_facts", []))
-        return total
+        return self._total_xbrl_facts
     
     def save_to_json(self, filepath: str) -> None:
         """Save the dataset to a JSON file."""
@@ -109,8 +160,8 @@ class FinancialsCalculationDataset:
         
         data = self._companies
         
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         
         print(f"Dataset saved to {filepath}")
     
@@ -132,12 +183,12 @@ class FinancialsCalculationDataset:
             return None
         
         try:
-            with open(filepath, 'r') as f:
-                companies = json.load(f)
+            with open(filepath, 'rb') as f:
+                dataset = cls(orjson.loads(f.read()))
             
-            print(f"Dataset loaded from {filepath} ({len(companies)} companies)")
-            return cls(companies)
+            print(f"Dataset loaded from {filepath} ({dataset.size()} companies)")
+            return dataset
         
-        except (json.JSONDecodeError, KeyError) as e:
+        except (orjson.JSONDecodeError, KeyError) as e:
             print(f"Error loading dataset from {filepath}: {e}")
             return None
@@ -1,10 +1,15 @@
-import json
+import functools
 import os
 import time
 import random
 
+import orjson
+
 from experiments.financials_calculation.data.dataset import FinancialsCalculationDataset
 
+# Cached so repeated calls in one process share the loaded dataset instead of
+# re-reading the file; call create_dataset.cache_clear() to reload
+@functools.cache
 def create_dataset() -> FinancialsCalculationDataset:
     """Create a financials calculation dataset.
     
@@ -13,6 +18,6 @@ def create_dataset() -> FinancialsCalculationDataset:
     """
     # Load the dataset.json file
     current_dir = os.path.dirname(__file__)
-    with open(os.path.join(current_dir, "dataset.json"), "r") as f:
-        dataset = json.load(f)
-        return FinancialsCalculationDataset(dataset)
+    with open(os.path.join(current_dir, "dataset.json"), "rb") as f:
+        dataset = orjson.loads(f.read())
+    return FinancialsCalculationDataset(dataset)
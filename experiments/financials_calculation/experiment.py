@@ -1,14 +1,102 @@
+import asyncio
 import json
+import os
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Callable, Iterable, Literal
+from clients import AIMDController, LLMCache, close_shared_async_client, retry_async, warmup_all
 from clients.anthropic_client import AnthropicClient
 from clients.openai_client import OpenAIClient
 from clients.gemini_client import GeminiClient
 from clients.kimi_client import KimiClient
 from clients.deepseek_client import DeepSeekClient
 from experiments.financials_calculation.data.dataset import FinancialsCalculationDataset
-from experiments.financials_calculation.tools import CostOfRevenueCalculationOutput, FinancialsCalculationTool
-from pydantic import BaseModel
+from experiments.financials_calculation.fast_path import try_direct_extract
+from experiments.financials_calculation.tools import (
+    BATCH_TOOL_NAME,
+    TOOL_NAME,
+    CostOfRevenueBatchCalculationOutput,
+    CostOfRevenueCalculationOutput,
+    FinancialsCalculationTool,
+)
+from pydantic import BaseModel, ValidationError
+
+# Extraction rules and few-shot examples shared by the single-company and batch prompts
+COST_OF_REVENUE_INSTRUCTIONS = (
+    "**Instructions:**\n"
+    "You must follow a strict hierarchy of approaches:\n\n"
+    "### 1. **Direct Extraction**\n"
+    "Look for any of the following XBRL concepts:\n"
+    "- `us-gaap:CostOfRevenue`\n"
+    "- `us-gaap:CostOfGoodsAndServicesSold`\n"
+    "- `us-gaap:CostOfGoodsSold`\n"
+    "- `us-gaap:CostOfServices`\n"
+    "- `us-gaap:CostOfSales`\n"
+    "If one of these is present, use its value directly.\n\n"
+    "### 2. **Calculation-Based Estimation**\n"
+    "If direct extraction is not possible, calculate using the first available formula below:\n"
+    "- **Formula 1:** `us-gaap:Revenues` - `us-gaap:GrossProfit`\n"
+    "- **Formula 2:** `us-gaap:CostOfGoodsSold` + `us-gaap:CostOfServices`\n"
+    "- **Formula 3:** `us-gaap:OperatingExpenses` - `us-gaap:SellingGeneralAndAdministrativeExpense` - `us-gaap:ResearchAndDevelopmentExpense`\n"
+    "- **Formula 4:** `us-gaap:CostOfRevenueFromContractWithCustomerExcludingAmortization` + `us-gaap:CostOfRevenueAmortization` + `us-gaap:CostOfRevenueHosting`\n"
+    "- **Formula 5:** `us-gaap:CostOfSales`\n"
+    "- **Formula 6:** `us-gaap:CostOfGoodsSold`\n\n"
+    "### 3. **Imputation (Fallback Case)**\n"
+    "If no formulas can be applied, and no direct tag is present, **impute** cost of revenue by using the following **industry-specific or ambiguous** tags when available:\n"
+    "- `us-gaap:PolicyholderBenefitsAndClaimsIncurredNet`\n"
+    "- `us-gaap:ClaimsAndClaimsAdjustmentExpenses`\n"
+    "- `us-gaap:CostsAndExpenses`\n"
+    "- `us-gaap:OperatingCostsAndExpenses`\n"
+    "- `us-gaap:InterestExpenseBenefitNet`\n"
+    "- `us-gaap:CostOfGoodsAndServicesSold` (if used in a non-standard context)\n"
+    "Only use these tags if **none** of the above methods can be used.\n\n"
+    "**Few-shot Examples:**\n\n"
+    "**Example 1 - Direct Extraction:**\n"
+    "```\n"
+    '[{"concept": "us-gaap:CostOfRevenue", "numeric_value": 26932000}]\n'
+    "Result: Cost of Revenue = 26,932,000 (directly extracted)\n"
+    "```\n\n"
+    "**Example 2 - Revenue minus Gross Profit:**\n"
+    "```\n"
+    '[{"concept": "us-gaap:Revenues", "numeric_value": 1615709000}, {"concept": "us-gaap:GrossProfit", "numeric_value": 341328000}]\n'
+    "Result: Cost of Revenue = 1,615,709,000 - 341,328,000 = 1,274,381,000\n"
+    "```\n\n"
+    "**Example 3 - Imputed via Insurance Claim Costs:**\n"
+    "```\n"
+    '[{"concept": "us-gaap:PolicyholderBenefitsAndClaimsIncurredNet", "numeric_value": 1170000000}, {"concept": "us-gaap:PremiumsEarnedNet", "numeric_value": 1650000000}]\n'
+    "Result: Cost of Revenue = 1,170,000,000 (imputed from PolicyholderBenefitsAndClaimsIncurredNet)\n"
+    "```\n\n"
+)
+
+# Fields requested for every company, in single and batch responses
+RESPONSE_FIELDS = (
+    "- `cost_of_revenue`: The extracted, calculated, or imputed numeric value\n"
+    "- `method`: One of 'direct_extraction', 'calculation', or 'imputation'\n"
+    "- `formula_used`: The specific formula or concept(s) used\n"
+    "- `reasoning`: Clear explanation of your logic and assumptions\n"
+    "- `confidence`: High / Medium / Low based on the reliability of the method used"
+)
+
+# Static system prompts: byte-identical on every request, so providers can
+# serve the instruction prefix from their prompt caches
+SYSTEM_PROMPT = (
+    "You are a financial analyst. You are given XBRL facts from the income statement of a public company.\n\n"
+    "Your job is to extract or calculate the **Cost of Revenue** for this company.\n\n"
+    f"{COST_OF_REVENUE_INSTRUCTIONS}"
+    f"**Respond using the `{TOOL_NAME}` function call**, providing:\n"
+    f"{RESPONSE_FIELDS}"
+)
+
+BATCH_SYSTEM_PROMPT = (
+    "You are a financial analyst. You are given XBRL facts from the income statements of several public companies.\n\n"
+    "Your job is to extract or calculate the **Cost of Revenue** for each company, treating every company independently.\n\n"
+    f"{COST_OF_REVENUE_INSTRUCTIONS}"
+    f"**Respond with a single `{BATCH_TOOL_NAME}` function call** whose `results` array holds one entry per company, "
+    "in the order listed, each providing:\n"
+    f"{RESPONSE_FIELDS}"
+)
 
 
 class CostOfRevenuePredictionResult(BaseModel):
@@ -25,6 +113,17 @@ class CostOfRevenuePredictionResult(BaseModel):
     duration: float  # Time taken for the call
 
 
+class CachedOutputs(BaseModel):
+    """One call's parsed outputs and its billing, as stored in the result cache.
+
+    Ground truth is deliberately left out: it comes from the current dataset
+    when the predictions are rebuilt, never from the cache.
+    """
+    outputs: list[CostOfRevenueCalculationOutput]
+    cost: float  # Whole call, split across its companies on rebuild
+    duration: float
+
+
 class ModelResults(BaseModel):
     """All cost of revenue prediction results from a specific model."""
     model_provider: str
@@ -43,520 +142,628 @@ class ExperimentResults(BaseModel):
     deepseek: ModelResults | None = None
 
 
-class FinancialsCalculationExperiment:
-  def __init__(self):
-    self.anthropic_client = AnthropicClient()
-    self.openai_client = OpenAIClient()
-    self.gemini_client = GeminiClient()
-    self.kimi_client = KimiClient()
-    self.deepseek_client = DeepSeekClient()
-
-  def run(self, dataset: FinancialsCalculationDataset) -> ExperimentResults:
-    # Get the companies from the dataset
-    companies = dataset.get_companies()
-
-    # Execute all LLM calls in parallel using ThreadPoolExecutor
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        # Submit all tasks
-        future_to_provider = {
-            executor.submit(self._call_openai, companies): "openai",
-            executor.submit(self._call_anthropic, companies): "anthropic", 
-            executor.submit(self._call_gemini, companies): "gemini",
-            executor.submit(self._call_kimi, companies): "kimi",
-            executor.submit(self._call_deepseek, companies): "deepseek"
-        }
-        
-        # Collect results as they complete
-        results = {}
-        for future in as_completed(future_to_provider):
-            provider = future_to_provider[future]
-            try:
-                result = future.result()
-                results[provider] = result
-                print(f"✅ {provider.capitalize()} completed")
-            except Exception as e:
-                print(f"❌ {provider.capitalize()} failed: {e}")
-                results[provider] = None
-
-    return ExperimentResults(
-        openai=results.get("openai"),
-        anthropic=results.get("anthropic"),
-        gemini=results.get("gemini"),
-        kimi=results.get("kimi"),
-        deepseek=results.get("deepseek")
+@dataclass(frozen=True)
+class ProviderSpec:
+    """How to call one provider for the experiment and read its responses."""
+    name: str  # Field name in ExperimentResults
+    label: str  # Display name in progress output
+    emoji: str
+    client_attr: str  # Experiment attribute holding the client, built on first use
+    model: str
+    input_cost_per_million_tokens: float
+    output_cost_per_million_tokens: float
+    tool_def_fn: Callable[..., dict]  # Tool definition, taking batch=True for the batch variant
+    parse_fn: Callable[[any], str | dict | None]  # Tool call arguments (JSON or dict) from a response, None if absent
+    usage_fn: Callable[[any], tuple[float, float]]  # Billed (input, output) tokens of a response
+    force_tool_choice: bool = False  # Name the tool in tool_choice (OpenAI-style APIs)
+    system_prompt: Literal["message", "argument", "cached_blocks"] = "message"  # How the system prompt is sent
+    batch_api: bool = False  # Whether the client supports submit_batch()/poll_batch()
+
+    def request(self, messages: list[dict], is_batch: bool) -> dict:
+        """Build the client keyword arguments for one (possibly batched) prompt."""
+        kwargs = {"model": self.model, "tools": self._tools[is_batch]}
+        if self.force_tool_choice:
+            kwargs["tool_choice"] = {"type": "function", "function": {"name": BATCH_TOOL_NAME if is_batch else TOOL_NAME}}
+
+        system, user_messages = messages[0]["content"], messages[1:]
+        if self.system_prompt == "message":
+            kwargs["messages"] = messages
+        elif self.system_prompt == "argument":
+            kwargs["messages"] = user_messages
+            kwargs["system"] = system
+        else:
+            # Mark the static system prompt as a prompt-cache breakpoint
+            kwargs["messages"] = user_messages
+            kwargs["system"] = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+        return kwargs
+
+    @cached_property
+    def _tools(self) -> dict[bool, list[dict]]:
+        """Tool lists for the single-company and batch variants, built once per provider."""
+        return {False: [self.tool_def_fn()], True: [self.tool_def_fn(batch=True)]}
+
+    def cost(self, response: any, discount: float = 1.0) -> float:
+        """Price a response from its token usage."""
+        input_tokens, output_tokens = self.usage_fn(response)
+        input_cost = (input_tokens / 1_000_000) * self.input_cost_per_million_tokens
+        output_cost = (output_tokens / 1_000_000) * self.output_cost_per_million_tokens
+        return (input_cost + output_cost) * discount
+
+
+def _openai_tool_arguments(response: any) -> str | None:
+    """Raw JSON tool call arguments from an OpenAI-style chat completion."""
+    tool_calls = response.choices[0].message.tool_calls
+    if not tool_calls:
+        return None
+    return tool_calls[0].function.arguments
+
+
+def _anthropic_tool_arguments(response: any) -> dict | None:
+    """Input of the first tool use block in an Anthropic message."""
+    tool_use = next((block for block in response.content if block.type == "tool_use"), None)
+    return tool_use.input if tool_use else None
+
+
+def _gemini_tool_arguments(response: any) -> dict | None:
+    """Arguments of the function call in a Gemini response."""
+    if not response.candidates:
+        return None
+    # Walk the nested response models once instead of per check
+    parts = response.candidates[0].content.parts
+    function_call = parts[0].function_call if parts else None
+    return function_call.args if function_call else None
+
+
+def _openai_usage(response: any) -> tuple[float, float]:
+    return response.usage.prompt_tokens, response.usage.completion_tokens
+
+
+def _anthropic_usage(response: any) -> tuple[float, float]:
+    usage = response.usage
+    # Prompt-cache writes bill at 1.25x the input rate, reads at 0.1x
+    billed_input_tokens = (
+        usage.input_tokens
+        + 1.25 * (usage.cache_creation_input_tokens or 0)
+        + 0.1 * (usage.cache_read_input_tokens or 0)
     )
+    return billed_input_tokens, usage.output_tokens
+
+
+def _gemini_usage(response: any) -> tuple[float, float]:
+    return response.usage_metadata.prompt_token_count, response.usage_metadata.candidates_token_count
+
+
+# Every provider the experiment can evaluate, in reporting order
+PROVIDERS = [
+    ProviderSpec(
+        name="openai",
+        label="OpenAI",
+        emoji="🤖",
+        client_attr="openai_client",
+        model="o3",
+        input_cost_per_million_tokens=2.50,
+        output_cost_per_million_tokens=10.00,
+        tool_def_fn=FinancialsCalculationTool.openai_tool_definition,
+        parse_fn=_openai_tool_arguments,
+        usage_fn=_openai_usage,
+        force_tool_choice=True,
+        batch_api=True,
+    ),
+    ProviderSpec(
+        name="anthropic",
+        label="Anthropic",
+        emoji="🧠",
+        client_attr="anthropic_client",
+        model="claude-opus-4-20250514",
+        input_cost_per_million_tokens=3.00,
+        output_cost_per_million_tokens=15.00,
+        tool_def_fn=FinancialsCalculationTool.anthropic_tool_definition,
+        parse_fn=_anthropic_tool_arguments,
+        usage_fn=_anthropic_usage,
+        system_prompt="cached_blocks",
+        batch_api=True,
+    ),
+    ProviderSpec(
+        name="gemini",
+        label="Gemini",
+        emoji="💎",
+        client_attr="gemini_client",
+        model="gemini-2.5-pro",
+        input_cost_per_million_tokens=2.50,
+        output_cost_per_million_tokens=10.00,
+        tool_def_fn=FinancialsCalculationTool.gemini_tool_definition,
+        parse_fn=_gemini_tool_arguments,
+        usage_fn=_gemini_usage,
+        system_prompt="argument",
+    ),
+    ProviderSpec(
+        name="kimi",
+        label="Kimi",
+        emoji="🌙",
+        client_attr="kimi_client",
+        model="kimi-k2-0711-preview",
+        input_cost_per_million_tokens=1.00,  # Estimated pricing
+        output_cost_per_million_tokens=3.00,  # Estimated pricing
+        tool_def_fn=FinancialsCalculationTool.kimi_tool_definition,
+        parse_fn=_openai_tool_arguments,
+        usage_fn=_openai_usage,
+        force_tool_choice=True,
+    ),
+    ProviderSpec(
+        name="deepseek",
+        label="DeepSeek",
+        emoji="🔍",
+        client_attr="deepseek_client",
+        model="deepseek-reasoner",
+        input_cost_per_million_tokens=0.14,  # Estimated pricing based on DeepSeek's competitive rates
+        output_cost_per_million_tokens=0.28,  # Estimated pricing
+        tool_def_fn=FinancialsCalculationTool.deepseek_tool_definition,
+        parse_fn=_openai_tool_arguments,
+        usage_fn=_openai_usage,
+    ),
+]
 
-  def _generate_prompt(self, ticker: str, xbrl_facts: list[dict]) -> list[dict]:
-    """Format the user message for LLM input."""
-    return [{
-      "role": "user",
-      "content": (
-          f"You are a financial analyst. You are given XBRL facts from the income statement of the public company {ticker}.\n\n"
-          f"Here are the XBRL facts:\n{json.dumps(xbrl_facts, indent=2)}\n\n"
-          "Your job is to extract or calculate the **Cost of Revenue** for this company.\n\n"
-          "**Instructions:**\n"
-          "You must follow a strict hierarchy of approaches:\n\n"
-          "### 1. **Direct Extraction**\n"
-          "Look for any of the following XBRL concepts:\n"
-          "- `us-gaap:CostOfRevenue`\n"
-          "- `us-gaap:CostOfGoodsAndServicesSold`\n"
-          "- `us-gaap:CostOfGoodsSold`\n"
-          "- `us-gaap:CostOfServices`\n"
-          "- `us-gaap:CostOfSales`\n"
-          "If one of these is present, use its value directly.\n\n"
-          "### 2. **Calculation-Based Estimation**\n"
-          "If direct extraction is not possible, calculate using the first available formula below:\n"
-          "- **Formula 1:** `us-gaap:Revenues` - `us-gaap:GrossProfit`\n"
-          "- **Formula 2:** `us-gaap:CostOfGoodsSold` + `us-gaap:CostOfServices`\n"
-          "- **Formula 3:** `us-gaap:OperatingExpenses` - `us-gaap:SellingGeneralAndAdministrativeExpense` - `us-gaap:ResearchAndDevelopmentExpense`\n"
-          "- **Formula 4:** `us-gaap:CostOfRevenueFromContractWithCustomerExcludingAmortization` + `us-gaap:CostOfRevenueAmortization` + `us-gaap:CostOfRevenueHosting`\n"
-          "- **Formula 5:** `us-gaap:CostOfSales`\n"
-          "- **Formula 6:** `us-gaap:CostOfGoodsSold`\n\n"
-          "### 3. **Imputation (Fallback Case)**\n"
-          "If no formulas can be applied, and no direct tag is present, **impute** cost of revenue by using the following **industry-specific or ambiguous** tags when available:\n"
-          "- `us-gaap:PolicyholderBenefitsAndClaimsIncurredNet`\n"
-          "- `us-gaap:ClaimsAndClaimsAdjustmentExpenses`\n"
-          "- `us-gaap:CostsAndExpenses`\n"
-          "- `us-gaap:OperatingCostsAndExpenses`\n"
-          "- `us-gaap:InterestExpenseBenefitNet`\n"
-          "- `us-gaap:CostOfGoodsAndServicesSold` (if used in a non-standard context)\n"
-          "Only use these tags if **none** of the above methods can be used.\n\n"
-          "**Few-shot Examples:**\n\n"
-          "**Example 1 - Direct Extraction:**\n"
-          "```\n"
-          '[{"concept": "us-gaap:CostOfRevenue", "numeric_value": 26932000}]\n'
-          "Result: Cost of Revenue = 26,932,000 (directly extracted)\n"
-          "```\n\n"
-          "**Example 2 - Revenue minus Gross Profit:**\n"
-          "```\n"
-          '[{"concept": "us-gaap:Revenues", "numeric_value": 1615709000}, {"concept": "us-gaap:GrossProfit", "numeric_value": 341328000}]\n'
-          "Result: Cost of Revenue = 1,615,709,000 - 341,328,000 = 1,274,381,000\n"
-          "```\n\n"
-          "**Example 3 - Imputed via Insurance Claim Costs:**\n"
-          "```\n"
-          '[{"concept": "us-gaap:PolicyholderBenefitsAndClaimsIncurredNet", "numeric_value": 1170000000}, {"concept": "us-gaap:PremiumsEarnedNet", "numeric_value": 1650000000}]\n'
-          "Result: Cost of Revenue = 1,170,000,000 (imputed from PolicyholderBenefitsAndClaimsIncurredNet)\n"
-          "```\n\n"
-          "**Respond using the `cost_of_revenue_calculation` function call**, providing:\n"
-          "- `cost_of_revenue`: The extracted, calculated, or imputed numeric value\n"
-          "- `method`: One of 'direct_extraction', 'calculation', or 'imputation'\n"
-          "- `formula_used`: The specific formula or concept(s) used\n"
-          "- `reasoning`: Clear explanation of your logic and assumptions\n"
-          "- `confidence`: High / Medium / Low based on the reliability of the method used"
-      )
-    }]
-
-
-
-  def _call_openai(self, companies: list[dict]) -> ModelResults:
-    predictions = []
-    model = "o3"
-    input_cost_per_million_tokens = 2.50
-    output_cost_per_million_tokens = 10.00
-    total_cost = 0.0
-    total_time = 0.0
-
-    
-    print(f"🤖 OpenAI: extracting financials for {len(companies)} companies...")
-
-    for i, company in enumerate(companies, 1):
-        # Add sleep to avoid rate limiting
-        time.sleep(1)
-
-        ticker = company["ticker"]
-        xbrl_facts = company["xbrl_facts"]
-        print(f"  OpenAI: processing {ticker} ({i}/{len(companies)})")
-
-        messages = self._generate_prompt(ticker, xbrl_facts)
 
-        try:
-            # Start timing the API call
-            start_time = time.time()
-            
-            response = self.openai_client.call(
-              model=model,
-              messages=messages,
-              tools=[FinancialsCalculationTool.openai_tool_definition()],
-              tool_choice={"type": "function", "function": {"name": "cost_of_revenue_calculation"}}
-            )
-            
-            # End timing the API call
-            end_time = time.time()
-            call_duration = end_time - start_time
-            total_time += call_duration
+class FinancialsCalculationExperiment:
+  def __init__(
+      self,
+      concurrency_limit: int = 8,
+      batch_size: int = 1,
+      direct_extraction: bool = False,
+      realtime: bool = True,
+      checkpoint_dir: str | None = None,
+      max_attempts: int = 5
+  ):
+    # Maximum in-flight requests per provider
+    self.concurrency_limit = concurrency_limit
+    # Companies packed into each request; 1 keeps one request per company
+    self.batch_size = batch_size
+    # Parsed predictions per (model, prompt), so reruns skip answered prompts
+    self.result_cache = LLMCache()
+    # Answer filings that tag CostOfRevenue directly without an LLM call; off by
+    # default since it replaces those companies' model predictions
+    self.direct_extraction = direct_extraction
+    # False sends OpenAI and Anthropic through their Batch APIs: half the price,
+    # but results can take up to 24 hours and per-call latency is not measured
+    self.realtime = realtime
+    # Directory for per-provider JSONL checkpoints of finished predictions;
+    # an interrupted run resumes from them instead of paying for them again
+    self.checkpoint_dir = checkpoint_dir
+    # Attempts per request before a transient failure counts as permanent
+    self.max_attempts = max_attempts
+
+  # Clients are built on first use, so providers left out of a run never
+  # construct SDK clients or need their API keys
+  @cached_property
+  def openai_client(self) -> OpenAIClient:
+    return OpenAIClient()
+
+  @cached_property
+  def anthropic_client(self) -> AnthropicClient:
+    return AnthropicClient()
+
+  @cached_property
+  def gemini_client(self) -> GeminiClient:
+    return GeminiClient()
+
+  @cached_property
+  def kimi_client(self) -> KimiClient:
+    return KimiClient()
+
+  @cached_property
+  def deepseek_client(self) -> DeepSeekClient:
+    return DeepSeekClient()
+
+  def run(
+      self,
+      dataset: FinancialsCalculationDataset,
+      providers: Iterable[str] | None = None
+  ) -> ExperimentResults:
+    """Evaluate the selected providers (all by default); the rest are left as None in the results."""
+    selected = [spec for spec in PROVIDERS if providers is None or spec.name in providers]
+    unknown = set(providers or ()) - {spec.name for spec in PROVIDERS}
+    if unknown:
+      raise ValueError(f"Unknown providers: {', '.join(sorted(unknown))}")
 
-            # Calculate cost from usage
-            prompt_tokens = response.usage.prompt_tokens
-            completion_tokens = response.usage.completion_tokens
-            
-            input_cost = (prompt_tokens / 1_000_000) * input_cost_per_million_tokens
-            output_cost = (completion_tokens / 1_000_000) * output_cost_per_million_tokens
-            call_cost = input_cost + output_cost
-            total_cost += call_cost
+    # Get the companies from the dataset
+    companies = dataset.get_companies()
 
-            # Parse the tool call
-            tool_calls = response.choices[0].message.tool_calls
-            if not tool_calls:
-                print(f"No tool call returned for {ticker}")
-                continue
-
-            args = json.loads(tool_calls[0].function.arguments)
-            parsed = CostOfRevenueCalculationOutput(**args)
-
-            predictions.append(CostOfRevenuePredictionResult(
-                ticker=ticker,
-                model=model,
-                ground_truth=company.get("cost_of_revenue"),
-                prediction=parsed.cost_of_revenue,
-                reasoning=parsed.reasoning,
-                method=parsed.method,
-                formula_used=parsed.formula_used,
-                confidence=parsed.confidence,
-                cost=call_cost,
-                duration=call_duration,
-            ))
-
-            # Add sleep to avoid rate limiting
-            time.sleep(1)
+    # Build the selected clients up front, so a missing API key fails before any spend
+    for spec in selected:
+      self._client(spec)
+
+    # Execute the providers concurrently on one event loop
+    results = asyncio.run(self._run_providers(selected, companies))
+
+    return ExperimentResults(**results)
+
+  def _client(self, spec: ProviderSpec) -> any:
+    return getattr(self, spec.client_attr)
+
+  async def _run_providers(self, providers: list[ProviderSpec], companies: list[dict]) -> dict[str, ModelResults | None]:
+    # Open pooled connections on this loop before the first real requests, so
+    # TLS handshakes are not counted in the first calls' durations
+    await warmup_all([self._client(spec) for spec in providers], concurrency=self.concurrency_limit)
+
+    # Providers without a batch API stay on the live path when realtime is off
+    provider_calls = {
+        spec.name: (
+            self._call_provider(spec, companies)
+            if self.realtime or not spec.batch_api
+            else self._call_provider_batch(spec, companies)
+        )
+        for spec in providers
+    }
+    outcomes = await asyncio.gather(*provider_calls.values(), return_exceptions=True)
+
+    # This run's event loop ends here; a later run opens a fresh pool on its own loop
+    await close_shared_async_client()
+
+    # Collect results, isolating providers that failed outright
+    results = {}
+    for provider, outcome in zip(provider_calls, outcomes):
+        if isinstance(outcome, Exception):
+            print(f"❌ {provider.capitalize()} failed: {outcome}")
+            results[provider] = None
+        else:
+            print(f"✅ {provider.capitalize()} completed")
+            results[provider] = outcome
+    return results
 
-        except Exception as e:
-            print(f"Error processing {ticker}: {e}")
-
-    return ModelResults(
-        model_provider="openai", 
-        model_name=model, 
-        predictions=predictions, 
-        average_cost=total_cost / len(predictions) if predictions else 0,
-        average_duration=total_time / len(predictions) if predictions else 0
+  def _generate_prompt(self, ticker: str, xbrl_facts: list[dict]) -> list[dict]:
+    """Format the static system prompt and the company's XBRL facts for LLM input."""
+    return [
+      {"role": "system", "content": SYSTEM_PROMPT},
+      {"role": "user", "content": f"Company: {ticker}\n\nHere are the XBRL facts:\n{_compact_json(_prune_facts(xbrl_facts))}"},
+    ]
+
+  def _generate_batch_prompt(self, batch: list[tuple[str, list[dict]]]) -> list[dict]:
+    """Format the static batch system prompt and several (ticker, xbrl_facts) companies."""
+    companies = "".join(
+        f"**Company {position}: {ticker}**\nHere are the XBRL facts:\n{_compact_json(_prune_facts(xbrl_facts))}\n\n"
+        for position, (ticker, xbrl_facts) in enumerate(batch, 1)
     )
-  
-  def _call_anthropic(self, companies: list[dict]) -> ModelResults:
-    predictions = []
-    model = "claude-opus-4-20250514"
-    input_cost_per_million_tokens = 3.00
-    output_cost_per_million_tokens = 15.00
-    total_cost = 0.0
-    total_time = 0.0
+    return [
+      {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+      {"role": "user", "content": f"{companies}Return exactly {len(batch)} results, one per company in the order listed."},
+    ]
+
+  def _generate_messages(self, batch: list[dict]) -> list[dict]:
+    """Use the single-company prompt for batches of one, otherwise the batch prompt."""
+    if len(batch) == 1:
+      return self._generate_prompt(batch[0]["ticker"], batch[0]["xbrl_facts"])
+    return self._generate_batch_prompt([(company["ticker"], company["xbrl_facts"]) for company in batch])
+
+  def _load_predictions(
+      self,
+      spec: ProviderSpec,
+      batch: list[dict],
+      messages: list[dict]
+  ) -> list[CostOfRevenuePredictionResult] | None:
+    """Rebuild the predictions cached for this prompt and tool schema, with ground truth from the current batch."""
+    cached = self.result_cache.get(spec.model, messages, tools=spec._tools[len(batch) > 1])
+    if cached is None:
+      return None
+    try:
+      entry = CachedOutputs.model_validate(cached)
+    except ValidationError:
+      # An entry written by an older version of the experiment; ask again
+      return None
+    if len(entry.outputs) != len(batch):
+      return None
+    return self._to_predictions(spec.model, batch, entry.outputs, entry.cost, entry.duration)
+
+  def _store_predictions(
+      self,
+      spec: ProviderSpec,
+      batch: list[dict],
+      messages: list[dict],
+      outputs: list[CostOfRevenueCalculationOutput],
+      cost: float,
+      duration: float
+  ) -> None:
+    entry = CachedOutputs(outputs=outputs, cost=cost, duration=duration)
+    self.result_cache.set(spec.model, messages, entry.model_dump(), tools=spec._tools[len(batch) > 1])
+
+  def _split_direct_extractions(
+      self,
+      model: str,
+      companies: list[dict]
+  ) -> tuple[list[CostOfRevenuePredictionResult], list[dict]]:
+    """Return predictions for directly tagged companies and the companies still needing an LLM call."""
+    if not self.direct_extraction:
+      return [], companies
+
+    predictions, remaining = [], []
+    for company in companies:
+      parsed = try_direct_extract(company["xbrl_facts"])
+      if parsed is None:
+        remaining.append(company)
+        continue
+      predictions += self._to_predictions(model, [company], [parsed], 0.0, 0.0)
+    return predictions, remaining
+
+  def _to_predictions(
+      self,
+      model: str,
+      batch: list[dict],
+      outputs: list[CostOfRevenueCalculationOutput],
+      cost: float,
+      duration: float
+  ) -> list[CostOfRevenuePredictionResult]:
+    """Pair each company with its output, splitting the call's cost and latency evenly across them."""
+    return [
+        CostOfRevenuePredictionResult(
+            ticker=company["ticker"],
+            model=model,
+            ground_truth=company.get("cost_of_revenue"),
+            prediction=parsed.cost_of_revenue,
+            reasoning=parsed.reasoning,
+            method=parsed.method,
+            formula_used=parsed.formula_used,
+            confidence=parsed.confidence,
+            cost=cost / len(batch),
+            duration=duration / len(batch),
+        )
+        for company, parsed in zip(batch, outputs)
+    ]
+
+  def _parse_outputs(self, args: str | dict, size: int) -> list[CostOfRevenueCalculationOutput]:
+    """Parse tool call arguments, raw JSON or already decoded, into one output per company in the batch."""
+    output_cls = CostOfRevenueCalculationOutput if size == 1 else CostOfRevenueBatchCalculationOutput
+    # JSON strings go straight to pydantic's parser, without an intermediate dict
+    parsed = output_cls.model_validate_json(args) if isinstance(args, (str, bytes)) else output_cls.model_validate(args)
+    if size == 1:
+      return [parsed]
+
+    outputs = parsed.results
+    if len(outputs) != size:
+      raise ValueError(f"Expected {size} results, got {len(outputs)}")
+    return outputs
+
+  def _checkpoint_path(self, spec: ProviderSpec) -> str | None:
+    if self.checkpoint_dir is None:
+      return None
+    return os.path.join(self.checkpoint_dir, f"results_{spec.name}.jsonl")
+
+  def _resume_checkpoint(
+      self,
+      spec: ProviderSpec,
+      companies: list[dict]
+  ) -> tuple[list[CostOfRevenuePredictionResult], list[dict]]:
+    """Return the predictions checkpointed by an interrupted run and the companies still to do."""
+    path = self._checkpoint_path(spec)
+    if path is None or not os.path.exists(path):
+      return [], companies
+
+    resumed = [prediction for prediction in _load_jsonl(path) if prediction.model == spec.model]
+    # Count per ticker, since a company can appear once per filing
+    remaining = Counter(prediction.ticker for prediction in resumed)
+    pending = []
+    for company in companies:
+      if remaining[company["ticker"]] > 0:
+        remaining[company["ticker"]] -= 1
+      else:
+        pending.append(company)
+
+    if resumed:
+      print(f"  {spec.label}: resuming {len(resumed)} predictions from {path}")
+    return resumed, pending
+
+  def _append_checkpoint(self, spec: ProviderSpec, predictions: list[CostOfRevenuePredictionResult]) -> None:
+    path = self._checkpoint_path(spec)
+    if path is not None:
+      os.makedirs(self.checkpoint_dir, exist_ok=True)
+      _append_jsonl(path, predictions)
+
+  def _finish_checkpoint(self, spec: ProviderSpec, complete: bool) -> None:
+    """Retire the checkpoint once every company has a prediction, so the next run starts fresh."""
+    path = self._checkpoint_path(spec)
+    if complete and path is not None and os.path.exists(path):
+      os.replace(path, path.removesuffix(".jsonl") + ".done.jsonl")
+
+  async def _call_provider(self, spec: ProviderSpec, companies: list[dict]) -> ModelResults:
+    company_count = len(companies)
+    resumed, companies = self._resume_checkpoint(spec, companies)
+    total_cost = sum(prediction.cost for prediction in resumed)
+    total_time = sum(prediction.duration for prediction in resumed)
+    # AIMD only backs off below concurrency_limit, never above it
+    controller = AIMDController(initial=self.concurrency_limit, maximum=self.concurrency_limit)
     
-    print(f"🧠 Anthropic: extracting financials for {len(companies)} companies...")
+    print(f"{spec.emoji} {spec.label}: extracting financials for {len(companies)} companies...")
 
-    for i, company in enumerate(companies, 1):
-        # Add sleep to avoid rate limiting
-        time.sleep(1)
+    async def predict(i: int, batch: list[dict]) -> list[CostOfRevenuePredictionResult]:
+        nonlocal total_cost, total_time
+        tickers = ", ".join(company["ticker"] for company in batch)
 
-        ticker = company["ticker"]
-        xbrl_facts = company["xbrl_facts"]
-        print(f"  Anthropic: processing {ticker} ({i}/{len(companies)})")
+        messages = self._generate_messages(batch)
 
-        messages = self._generate_prompt(ticker, xbrl_facts)
+        cached = self._load_predictions(spec, batch, messages)
+        if cached:
+            total_cost += sum(prediction.cost for prediction in cached)
+            total_time += sum(prediction.duration for prediction in cached)
+            return cached
 
-        try:
-            # Start timing the API call
-            start_time = time.time()
-            
-            response = self.anthropic_client.call(
-                model=model,
-                messages=messages,
-                tools=[FinancialsCalculationTool.anthropic_tool_definition()]
-            )
-            
-            # End timing the API call
-            end_time = time.time()
-            call_duration = end_time - start_time
-            total_time += call_duration
+        start_time = time.perf_counter()
 
-            # Calculate cost from usage
-            prompt_tokens = response.usage.input_tokens
-            completion_tokens = response.usage.output_tokens
-            
-            input_cost = (prompt_tokens / 1_000_000) * input_cost_per_million_tokens
-            output_cost = (completion_tokens / 1_000_000) * output_cost_per_million_tokens
-            call_cost = input_cost + output_cost
-            total_cost += call_cost
-
-            # Find the tool use block in the response content
-            tool_use = None
-            for content_block in response.content:
-                if content_block.type == "tool_use":
-                    tool_use = content_block
-                    break
-            
-            if not tool_use:
-                print(f"No tool call returned for {ticker}")
-                continue
-
-            args = tool_use.input
-            parsed = CostOfRevenueCalculationOutput(**args)
-
-            predictions.append(CostOfRevenuePredictionResult(
-                ticker=ticker,
-                model=model,
-                ground_truth=company.get("cost_of_revenue"),
-                prediction=parsed.cost_of_revenue,
-                reasoning=parsed.reasoning,
-                method=parsed.method,
-                formula_used=parsed.formula_used,
-                confidence=parsed.confidence,
-                cost=call_cost,
-                duration=call_duration,
-            ))
-
-            # Add sleep to avoid rate limiting
-            time.sleep(1)
+        async def attempt_call() -> any:
+            # Hold a controller slot only while a request is in flight, so backoff
+            # sleeps free it and every retry waits out an open circuit breaker
+            nonlocal start_time
+            async with controller:
+                # Time only the attempt that answers, not the backoff or queueing before it
+                start_time = time.perf_counter()
+                return await self._client(spec).acall(**spec.request(messages, is_batch=len(batch) > 1))
 
-        except Exception as e:
-            print(f"Error processing {ticker} with Claude: {e}")
-
-    return ModelResults(
-        model_provider="anthropic", 
-        model_name=model, 
-        predictions=predictions,
-        average_cost=total_cost / len(predictions) if predictions else 0,
-        average_duration=total_time / len(predictions) if predictions else 0
-    )
-  
-  def _call_gemini(self, companies: list[dict]) -> ModelResults:
-    predictions = []
-    model = "gemini-2.5-pro"
-    input_cost_per_million_tokens = 2.50
-    output_cost_per_million_tokens = 10.00
-    total_cost = 0.0
-    total_time = 0.0
-    
-    print(f"💎 Gemini: extracting financials for {len(companies)} companies...")
-
-    for i, company in enumerate(companies, 1):
-        # Add sleep to avoid rate limiting
-        time.sleep(1)
-
-        ticker = company["ticker"]
-        xbrl_facts = company["xbrl_facts"]
-        print(f"  Gemini: processing {ticker} ({i}/{len(companies)})")
-
-        messages = self._generate_prompt(ticker, xbrl_facts)
+        def on_retry(attempt: int, error: BaseException) -> None:
+            controller.update(None, error=error)
+            print(f"  {spec.label}: retrying {tickers} (attempt {attempt + 1}/{self.max_attempts}) after {type(error).__name__}")
 
+        print(f"  {spec.label}: processing {tickers} ({i}/{len(batches)})")
         try:
-            # Start timing the API call
-            start_time = time.time()
-            
-            response = self.gemini_client.call(
-                model=model,
-                messages=messages,
-                tools=[FinancialsCalculationTool.gemini_tool_definition()]
-            )
+            # Retry rate limits, timeouts and 5xx with backoff; other errors fail at once
+            response = await retry_async(attempt_call, retries=self.max_attempts - 1, on_retry=on_retry)
             
             # End timing the API call
-            end_time = time.time()
+            end_time = time.perf_counter()
             call_duration = end_time - start_time
             total_time += call_duration
+            controller.update(call_duration)
 
             # Calculate cost from usage
-            prompt_tokens = response.usage_metadata.prompt_token_count
-            completion_tokens = response.usage_metadata.candidates_token_count
-            
-            input_cost = (prompt_tokens / 1_000_000) * input_cost_per_million_tokens
-            output_cost = (completion_tokens / 1_000_000) * output_cost_per_million_tokens
-            call_cost = input_cost + output_cost
+            call_cost = spec.cost(response)
             total_cost += call_cost
 
-            # Check for function call in Gemini response
-            function_call = None
-            if (response.candidates and 
-                response.candidates[0].content.parts and 
-                response.candidates[0].content.parts[0].function_call):
-                function_call = response.candidates[0].content.parts[0].function_call
-            
-            if not function_call:
-                print(f"No tool call returned for {ticker}")
-                continue
-
-            # Get arguments from function call
-            args = function_call.args
-            parsed = CostOfRevenueCalculationOutput(**args)
-
-            predictions.append(CostOfRevenuePredictionResult(
-                ticker=ticker,
-                model=model,
-                ground_truth=company.get("cost_of_revenue"),
-                prediction=parsed.cost_of_revenue,
-                reasoning=parsed.reasoning,
-                method=parsed.method,
-                formula_used=parsed.formula_used,
-                confidence=parsed.confidence,
-                cost=call_cost,
-                duration=call_duration,
-            ))
-
-            # Add sleep to avoid rate limiting
-            time.sleep(1)
+            # Parse the tool call
+            args = spec.parse_fn(response)
+            if args is None:
+                print(f"No tool call returned for {tickers}")
+                return []
+
+            outputs = self._parse_outputs(args, len(batch))
+            self._store_predictions(spec, batch, messages, outputs, call_cost, call_duration)
+            batch_predictions = self._to_predictions(spec.model, batch, outputs, call_cost, call_duration)
+            self._append_checkpoint(spec, batch_predictions)
+            return batch_predictions
 
         except Exception as e:
-            print(f"Error processing {ticker} with Gemini: {e}")
+            controller.update(None, error=e)
+            print(f"Error processing {tickers} with {spec.label} (permanent failure): {e}")
+            return []
+
+    direct_predictions, companies = self._split_direct_extractions(spec.model, companies)
+    batches = _chunked(companies, self.batch_size)
+    results = await asyncio.gather(*(predict(i, batch) for i, batch in enumerate(batches, 1)))
+    predictions = resumed + direct_predictions + [prediction for batch_results in results for prediction in batch_results]
+    self._finish_checkpoint(spec, complete=len(predictions) == company_count)
 
     return ModelResults(
-        model_provider="gemini", 
-        model_name=model, 
-        predictions=predictions,
+        model_provider=spec.name, 
+        model_name=spec.model, 
+        predictions=predictions, 
         average_cost=total_cost / len(predictions) if predictions else 0,
         average_duration=total_time / len(predictions) if predictions else 0
     )
 
-  def _call_kimi(self, companies: list[dict]) -> ModelResults:
-    predictions = []
-    model = "kimi-k2-0711-preview"
-    input_cost_per_million_tokens = 1.00  # Estimated pricing
-    output_cost_per_million_tokens = 3.00  # Estimated pricing
-    total_cost = 0.0
-    total_time = 0.0
-    
-    print(f"🌙 Kimi: extracting financials for {len(companies)} companies...")
-
-    for i, company in enumerate(companies, 1):      
-        # Add sleep to avoid rate limiting
-        time.sleep(1)
-
-        ticker = company["ticker"]
-        xbrl_facts = company["xbrl_facts"]
-        print(f"  Kimi: processing {ticker} ({i}/{len(companies)})")
-
-        messages = self._generate_prompt(ticker, xbrl_facts)
-
-        try:
-            # Start timing the API call
-            start_time = time.time()
-            
-            response = self.kimi_client.call(
-                model=model,
-                messages=messages,
-                tools=[FinancialsCalculationTool.kimi_tool_definition()],
-                tool_choice={"type": "function", "function": {"name": "cost_of_revenue_calculation"}}
-            )
-            
-            # End timing the API call
-            end_time = time.time()
-            call_duration = end_time - start_time
-            total_time += call_duration
-
-            # Calculate cost from usage
-            prompt_tokens = response.usage.prompt_tokens
-            completion_tokens = response.usage.completion_tokens
-            
-            input_cost = (prompt_tokens / 1_000_000) * input_cost_per_million_tokens
-            output_cost = (completion_tokens / 1_000_000) * output_cost_per_million_tokens
-            call_cost = input_cost + output_cost
-            total_cost += call_cost
-
-            # Parse the tool call (OpenAI-style response)
-            tool_calls = response.choices[0].message.tool_calls
-            if not tool_calls:
-                print(f"No tool call returned for {ticker}")
-                continue
-
-            args = json.loads(tool_calls[0].function.arguments)
-            parsed = CostOfRevenueCalculationOutput(**args)
-
-            predictions.append(CostOfRevenuePredictionResult(
-                ticker=ticker,
-                model=model,
-                ground_truth=company.get("cost_of_revenue"),
-                prediction=parsed.cost_of_revenue,
-                reasoning=parsed.reasoning,
-                method=parsed.method,
-                formula_used=parsed.formula_used,
-                confidence=parsed.confidence,
-                cost=call_cost,
-                duration=call_duration,
-            ))
-
-        except Exception as e:
-            print(f"Error processing {ticker} with Kimi: {e}")
+  async def _call_provider_batch(self, spec: ProviderSpec, companies: list[dict]) -> ModelResults:
+    company_count = len(companies)
+    resumed, companies = self._resume_checkpoint(spec, companies)
+    total_cost = sum(prediction.cost for prediction in resumed)
+
+    print(f"{spec.emoji} {spec.label}: submitting {len(companies)} companies to the batch API...")
+
+    direct_predictions, companies = self._split_direct_extractions(spec.model, companies)
+    predictions = resumed + direct_predictions
+    pending = {}
+    for i, batch in enumerate(_chunked(companies, self.batch_size)):
+      messages = self._generate_messages(batch)
+      cached = self._load_predictions(spec, batch, messages)
+      if cached:
+        predictions += cached
+        total_cost += sum(prediction.cost for prediction in cached)
+        continue
+      pending[f"batch-{i}"] = (batch, messages)
+
+    start_time = time.perf_counter()
+    responses = {}
+    if pending:
+      requests = [
+          {"custom_id": custom_id, **spec.request(messages, is_batch=len(batch) > 1)}
+          for custom_id, (batch, messages) in pending.items()
+      ]
+      # The batch client methods block, so keep them off the event loop
+      batch_id = await asyncio.to_thread(self._client(spec).submit_batch, requests)
+      responses = await asyncio.to_thread(self._client(spec).poll_batch, batch_id)
+    # Wall time of the whole batch, spread over the companies it answered
+    company_duration = (time.perf_counter() - start_time) / max(len(companies), 1)
+
+    for custom_id, (batch, messages) in pending.items():
+      tickers = ", ".join(company["ticker"] for company in batch)
+      response = responses.get(custom_id)
+      if response is None:
+        print(f"No batch result returned for {tickers}")
+        continue
+      try:
+        # Batch requests bill at half the real-time rates
+        call_cost = spec.cost(response, discount=0.5)
+        total_cost += call_cost
+
+        args = spec.parse_fn(response)
+        if args is None:
+          print(f"No tool call returned for {tickers}")
+          continue
+
+        outputs = self._parse_outputs(args, len(batch))
+        self._store_predictions(spec, batch, messages, outputs, call_cost, company_duration * len(batch))
+        batch_predictions = self._to_predictions(spec.model, batch, outputs, call_cost, company_duration * len(batch))
+        self._append_checkpoint(spec, batch_predictions)
+        predictions += batch_predictions
+      except Exception as e:
+        print(f"Error processing {tickers} with {spec.label}: {e}")
+
+    self._finish_checkpoint(spec, complete=len(predictions) == company_count)
 
     return ModelResults(
-        model_provider="kimi", 
-        model_name=model, 
+        model_provider=spec.name,
+        model_name=spec.model,
         predictions=predictions,
         average_cost=total_cost / len(predictions) if predictions else 0,
-        average_duration=total_time / len(predictions) if predictions else 0
+        average_duration=sum(prediction.duration for prediction in predictions) / len(predictions) if predictions else 0
     )
 
-  def _call_deepseek(self, companies: list[dict]) -> ModelResults:
-    predictions = []
-    model = "deepseek-reasoner"
-    input_cost_per_million_tokens = 0.14  # Estimated pricing based on DeepSeek's competitive rates
-    output_cost_per_million_tokens = 0.28  # Estimated pricing
-    total_cost = 0.0
-    total_time = 0.0
-    
-    print(f"🔍 DeepSeek: extracting financials for {len(companies)} companies...")
 
-    for i, company in enumerate(companies, 1):
-        # Add sleep to avoid rate limiting
-        time.sleep(1)
-
-        ticker = company["ticker"]
-        xbrl_facts = company["xbrl_facts"]
-        print(f"  DeepSeek: processing {ticker} ({i}/{len(companies)})")
-
-        messages = self._generate_prompt(ticker, xbrl_facts)
-
-        try:
-            # Start timing the API call
-            start_time = time.time()
-            
-            response = self.deepseek_client.call(
-                model=model,
-                messages=messages,
-                tools=[FinancialsCalculationTool.deepseek_tool_definition()]
-            )
-            
-            # End timing the API call
-            end_time = time.time()
-            call_duration = end_time - start_time
-            total_time += call_duration
-
-            # Calculate cost from usage
-            prompt_tokens = response.usage.prompt_tokens
-            completion_tokens = response.usage.completion_tokens
-            
-            input_cost = (prompt_tokens / 1_000_000) * input_cost_per_million_tokens
-            output_cost = (completion_tokens / 1_000_000) * output_cost_per_million_tokens
-            call_cost = input_cost + output_cost
-            total_cost += call_cost
-
-            # Parse the tool call (OpenAI-style response)
-            tool_calls = response.choices[0].message.tool_calls
-            if not tool_calls:
-                print(f"No tool call returned for {ticker}")
-                continue
-
-            args = json.loads(tool_calls[0].function.arguments)
-            parsed = CostOfRevenueCalculationOutput(**args)
-
-            predictions.append(CostOfRevenuePredictionResult(
-                ticker=ticker,
-                model=model,
-                ground_truth=company.get("cost_of_revenue"),
-                prediction=parsed.cost_of_revenue,
-                reasoning=parsed.reasoning,
-                method=parsed.method,
-                formula_used=parsed.formula_used,
-                confidence=parsed.confidence,
-                cost=call_cost,
-                duration=call_duration,
-            ))
-
-            # Add sleep to avoid rate limiting
-            time.sleep(1)
-
-        except Exception as e:
-            print(f"Error processing {ticker} with DeepSeek: {e}")
-
-    return ModelResults(
-        model_provider="deepseek", 
-        model_name=model, 
-        predictions=predictions,
-        average_cost=total_cost / len(predictions) if predictions else 0,
-        average_duration=total_time / len(predictions) if predictions else 0
-    )
+def _chunked(items: list, size: int) -> list[list]:
+  """Split items into consecutive chunks of at most `size`."""
+  return [items[start:start + size] for start in range(0, len(items), size)]
 
 
+def _prune_facts(xbrl_facts: list[dict]) -> list[dict]:
+  """
+  Keep only what the model needs from each fact.
+  
+  `value` repeats `numeric_value` as a string, `statement_type` is always the
+  income statement and facts without a value carry nothing. Whole numbers are
+  emitted as ints, so 26932000.0 reaches the model as 26932000.
+  """
+  pruned = []
+  for fact in xbrl_facts:
+    value = fact.get("numeric_value")
+    if value is None:
+      continue
+    if isinstance(value, float) and value.is_integer():
+      value = int(value)
+    pruned.append({
+      "concept": fact["concept"],
+      "numeric_value": value,
+      "period_start": fact.get("period_start"),
+      "period_end": fact.get("period_end"),
+    })
+  return pruned
+
+
+def _compact_json(value: any) -> str:
+  """Serialize without indentation, which costs tokens but tells the model nothing."""
+  return json.dumps(value, separators=(",", ":"))
+
+
+def _append_jsonl(path: str, predictions: list[CostOfRevenuePredictionResult]) -> None:
+  """Append predictions as JSON lines, synced to disk before returning."""
+  with open(path, "a") as f:
+    for prediction in predictions:
+      f.write(prediction.model_dump_json() + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _load_jsonl(path: str) -> list[CostOfRevenuePredictionResult]:
+  predictions = []
+  with open(path) as f:
+    for line in f:
+      if not line.strip():
+        continue
+      try:
+        predictions.append(CostOfRevenuePredictionResult.model_validate_json(line))
+      except ValueError:
+        # A line torn by an interrupted write; that company is simply redone
+        continue
+  return predictions
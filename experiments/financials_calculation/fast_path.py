@@ -0,0 +1,26 @@
+"""
+Deterministic cost of revenue extraction, tried before any LLM call.
+
+Only `us-gaap:CostOfRevenue` is trusted here. The other direct-extraction
+tags in the prompt (CostOfGoodsAndServicesSold, CostOfServices, ...) often
+cover just one component of the reported total, so those filings still need
+the model's judgement.
+"""
+
+from experiments.financials_calculation.tools import CostOfRevenueCalculationOutput
+
+DIRECT_CONCEPT = "us-gaap:CostOfRevenue"
+
+
+def try_direct_extract(xbrl_facts: list[dict]) -> CostOfRevenueCalculationOutput | None:
+    """Return the cost of revenue when the filing tags it directly, else None."""
+    for fact in xbrl_facts:
+        if fact.get("concept") == DIRECT_CONCEPT and fact.get("numeric_value") is not None:
+            return CostOfRevenueCalculationOutput(
+                cost_of_revenue=fact["numeric_value"],
+                method="direct_extraction",
+                formula_used=DIRECT_CONCEPT,
+                reasoning=f"Extracted directly from the {DIRECT_CONCEPT} fact without an LLM call.",
+                confidence="High",
+            )
+    return None
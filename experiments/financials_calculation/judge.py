@@ -1,6 +1,6 @@
 import math
 from experiments.common.models import RegressionEvaluationMetrics, RegressionComparisonResults
-from experiments.financials_calculation.experiment import ExperimentResults, ModelResults
+from experiments.financials_calculation.experiment import PROVIDERS, ExperimentResults, ModelResults
 
 
 class FinancialsCalculationJudge:
@@ -9,34 +9,27 @@ class FinancialsCalculationJudge:
         """Evaluate all model results and return comprehensive regression metrics."""
         evaluation_results = RegressionComparisonResults()
         
-        # Evaluate each model if results exist
-        if results.openai:
-            evaluation_results.openai = self._evaluate_model(results.openai)
-        
-        if results.anthropic:
-            evaluation_results.anthropic = self._evaluate_model(results.anthropic)
-            
-        if results.gemini:
-            evaluation_results.gemini = self._evaluate_model(results.gemini)
-        
-        if results.kimi:
-            evaluation_results.kimi = self._evaluate_model(results.kimi)
-        
-        if results.deepseek:
-            evaluation_results.deepseek = self._evaluate_model(results.deepseek)
+        # Evaluate each model if results exist, keeping the scored models for ranking
+        candidates = []
+        for spec in PROVIDERS:
+            model_results = getattr(results, spec.name)
+            if model_results:
+                metrics = self._evaluate_model(model_results)
+                setattr(evaluation_results, spec.name, metrics)
+                candidates.append((spec.name, metrics))
         
         # Find best performing models by different metrics
         evaluation_results.best_mae_model = self._find_best_model_by_metric(
-            evaluation_results, "mean_absolute_error", lower_is_better=True
+            candidates, "mean_absolute_error", lower_is_better=True
         )
         evaluation_results.best_rmse_model = self._find_best_model_by_metric(
-            evaluation_results, "root_mean_squared_error", lower_is_better=True
+            candidates, "root_mean_squared_error", lower_is_better=True
         )
         evaluation_results.best_r2_model = self._find_best_model_by_metric(
-            evaluation_results, "r_squared", lower_is_better=False
+            candidates, "r_squared", lower_is_better=False
         )
         evaluation_results.best_accuracy_5pct_model = self._find_best_model_by_metric(
-            evaluation_results, "accuracy_within_5_percent", lower_is_better=False
+            candidates, "accuracy_within_5_percent", lower_is_better=False
         )
         
         return evaluation_results
@@ -48,44 +41,59 @@ class FinancialsCalculationJudge:
         if not predictions:
             return self._empty_metrics(model_results)
         
-        # Extract predictions and ground truths
-        y_pred = [p.prediction for p in predictions]
-        y_true = [p.ground_truth for p in predictions]
-        
-        # Filter out any None values
-        valid_pairs = [(pred, true) for pred, true in zip(y_pred, y_true) 
-                      if pred is not None and true is not None]
+        # Accumulate every metric in a single pass over the predictions,
+        # skipping pairs with a missing value. The ground truth mean and sum of
+        # squares for R² use Welford's update, which stays exact at
+        # filing-sized values where sum(x²) - n·mean² would cancel.
+        n = 0
+        abs_error_sum = 0.0
+        squared_error_sum = 0.0
+        percentage_error_sum = 0.0
+        nonzero_count = 0
+        within_5pct = within_10pct = within_20pct = 0
+        y_mean = 0.0
+        ss_tot = 0.0
+        for p in predictions:
+            pred, true = p.prediction, p.ground_truth
+            if pred is None or true is None:
+                continue
+            n += 1
+            diff = pred - true
+            abs_error_sum += abs(diff)
+            squared_error_sum += diff * diff
+            
+            # MAPE excludes zero ground truth values; a zero ground truth only
+            # counts as accurate when the prediction is exactly zero too
+            if true != 0:
+                percentage_error = abs(diff / true)
+                percentage_error_sum += percentage_error
+                nonzero_count += 1
+                within_5pct += percentage_error <= 0.05
+                within_10pct += percentage_error <= 0.10
+                within_20pct += percentage_error <= 0.20
+            elif pred == 0:
+                within_5pct += 1
+                within_10pct += 1
+                within_20pct += 1
+            
+            delta = true - y_mean
+            y_mean += delta / n
+            ss_tot += delta * (true - y_mean)
         
-        if not valid_pairs:
+        if not n:
             return self._empty_metrics(model_results)
         
-        y_pred_valid = [pair[0] for pair in valid_pairs]
-        y_true_valid = [pair[1] for pair in valid_pairs]
-        n = len(valid_pairs)
-        
         # Calculate regression metrics
-        mae = sum(abs(pred - true) for pred, true in valid_pairs) / n
-        mse = sum((pred - true) ** 2 for pred, true in valid_pairs) / n
+        mae = abs_error_sum / n
+        mse = squared_error_sum / n
         rmse = math.sqrt(mse)
+        mape = (percentage_error_sum / nonzero_count * 100) if nonzero_count else float('inf')
+        r_squared = 1 - (squared_error_sum / ss_tot) if ss_tot != 0 else 0.0
         
-        # Calculate MAPE (Mean Absolute Percentage Error)
-        # Handle division by zero by excluding zero ground truth values
-        mape_values = []
-        for pred, true in valid_pairs:
-            if true != 0:
-                mape_values.append(abs((pred - true) / true))
-        mape = (sum(mape_values) / len(mape_values) * 100) if mape_values else float('inf')
-        
-        # Calculate R² score
-        y_mean = sum(y_true_valid) / n
-        ss_tot = sum((true - y_mean) ** 2 for true in y_true_valid)
-        ss_res = sum((true - pred) ** 2 for pred, true in valid_pairs)
-        r_squared = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0.0
-        
-        # Calculate accuracy within percentage thresholds
-        accuracy_5pct = self._calculate_percentage_accuracy(valid_pairs, 0.05)
-        accuracy_10pct = self._calculate_percentage_accuracy(valid_pairs, 0.10)
-        accuracy_20pct = self._calculate_percentage_accuracy(valid_pairs, 0.20)
+        # Accuracy within percentage thresholds
+        accuracy_5pct = within_5pct / n * 100
+        accuracy_10pct = within_10pct / n * 100
+        accuracy_20pct = within_20pct / n * 100
         
         return RegressionEvaluationMetrics(
             model_provider=model_results.model_provider,
@@ -103,24 +111,6 @@ class FinancialsCalculationJudge:
             average_duration=model_results.average_duration
         )
 
-    def _calculate_percentage_accuracy(self, valid_pairs: list[tuple[float, float]], threshold: float) -> float:
-        """Calculate the percentage of predictions within a given percentage threshold of ground truth."""
-        if not valid_pairs:
-            return 0.0
-        
-        within_threshold = 0
-        for pred, true in valid_pairs:
-            if true == 0:
-                # Handle zero ground truth case
-                if pred == 0:
-                    within_threshold += 1
-            else:
-                percentage_error = abs((pred - true) / true)
-                if percentage_error <= threshold:
-                    within_threshold += 1
-        
-        return (within_threshold / len(valid_pairs)) * 100
-
     def _empty_metrics(self, model_results: ModelResults) -> RegressionEvaluationMetrics:
         """Return empty metrics for models with no valid predictions."""
         return RegressionEvaluationMetrics(
@@ -139,42 +129,29 @@ class FinancialsCalculationJudge:
             average_duration=model_results.average_duration
         )
 
-    def _find_best_model_by_metric(self, results: RegressionComparisonResults, metric: str, lower_is_better: bool = True) -> str | None:
-        """Find the model with the best performance for a given metric."""
-        models = []
-        
-        if results.openai:
-            models.append(("openai", getattr(results.openai, metric)))
-        if results.anthropic:
-            models.append(("anthropic", getattr(results.anthropic, metric)))
-        if results.gemini:
-            models.append(("gemini", getattr(results.gemini, metric)))
-        if results.kimi:
-            models.append(("kimi", getattr(results.kimi, metric)))
-        if results.deepseek:
-            models.append(("deepseek", getattr(results.deepseek, metric)))
-        
-        if not models:
-            return None
-        
-        # Filter out infinite values
-        valid_models = [(name, value) for name, value in models if not math.isinf(value)]
-        if not valid_models:
-            return None
-            
-        # Find model with best metric value
-        if lower_is_better:
-            best_model = min(valid_models, key=lambda x: x[1])
-        else:
-            best_model = max(valid_models, key=lambda x: x[1])
-        
-        return best_model[0]
+    def _find_best_model_by_metric(
+        self,
+        candidates: list[tuple[str, RegressionEvaluationMetrics]],
+        metric: str,
+        lower_is_better: bool = True
+    ) -> str | None:
+        """Find the model with the best performance for a given metric, ignoring infinite values."""
+        best_name, best_value = None, None
+        for name, metrics in candidates:
+            value = getattr(metrics, metric)
+            if math.isinf(value):
+                continue
+            # Strict comparison keeps the earliest provider on ties
+            if best_value is None or (value < best_value if lower_is_better else value > best_value):
+                best_name, best_value = name, value
+        return best_name
 
     def print_evaluation_summary(self, results: RegressionComparisonResults) -> None:
         """Print a formatted summary of regression evaluation results."""
-        print("\n" + "="*70)
-        print("FINANCIALS CALCULATION EVALUATION RESULTS")
-        print("="*70)
+        # Collect the report and write it in one call rather than one per line
+        lines = ["\n" + "="*70]
+        lines.append("FINANCIALS CALCULATION EVALUATION RESULTS")
+        lines.append("="*70)
         
         models = [
             ("OpenAI", results.openai),
@@ -186,26 +163,27 @@ class FinancialsCalculationJudge:
         
         for provider_name, metrics in models:
             if metrics:
-                print(f"\n{provider_name} ({metrics.model_name}):")
-                print(f"  Total Predictions: {metrics.total_predictions}")
-                print(f"  MAE:              ${metrics.mean_absolute_error:,.0f}")
-                print(f"  RMSE:             ${metrics.root_mean_squared_error:,.0f}")
+                lines.append(f"\n{provider_name} ({metrics.model_name}):")
+                lines.append(f"  Total Predictions: {metrics.total_predictions}")
+                lines.append(f"  MAE:              ${metrics.mean_absolute_error:,.0f}")
+                lines.append(f"  RMSE:             ${metrics.root_mean_squared_error:,.0f}")
                 
                 if not math.isinf(metrics.mean_absolute_percentage_error):
-                    print(f"  MAPE:             {metrics.mean_absolute_percentage_error:.2f}%")
+                    lines.append(f"  MAPE:             {metrics.mean_absolute_percentage_error:.2f}%")
                 else:
-                    print(f"  MAPE:             N/A (division by zero)")
+                    lines.append(f"  MAPE:             N/A (division by zero)")
                 
-                print(f"  R²:               {metrics.r_squared:.3f}")
-                print(f"  Accuracy (±5%):   {metrics.accuracy_within_5_percent:.1f}%")
-                print(f"  Accuracy (±10%):  {metrics.accuracy_within_10_percent:.1f}%")
-                print(f"  Accuracy (±20%):  {metrics.accuracy_within_20_percent:.1f}%")
-                print(f"  Avg Cost:         ${metrics.average_cost:.4f}")
-                print(f"  Avg Duration:     {metrics.average_duration:.2f}s")
-        
-        print(f"\nBest Models:")
-        print(f"  Lowest MAE:       {results.best_mae_model}")
-        print(f"  Lowest RMSE:      {results.best_rmse_model}")
-        print(f"  Highest R²:       {results.best_r2_model}")
-        print(f"  Best ±5% Accuracy: {results.best_accuracy_5pct_model}")
-        print("="*70)
+                lines.append(f"  R²:               {metrics.r_squared:.3f}")
+                lines.append(f"  Accuracy (±5%):   {metrics.accuracy_within_5_percent:.1f}%")
+                lines.append(f"  Accuracy (±10%):  {metrics.accuracy_within_10_percent:.1f}%")
+                lines.append(f"  Accuracy (±20%):  {metrics.accuracy_within_20_percent:.1f}%")
+                lines.append(f"  Avg Cost:         ${metrics.average_cost:.4f}")
+                lines.append(f"  Avg Duration:     {metrics.average_duration:.2f}s")
+        
+        lines.append(f"\nBest Models:")
+        lines.append(f"  Lowest MAE:       {results.best_mae_model}")
+        lines.append(f"  Lowest RMSE:      {results.best_rmse_model}")
+        lines.append(f"  Highest R²:       {results.best_r2_model}")
+        lines.append(f"  Best ±5% Accuracy: {results.best_accuracy_5pct_model}")
+        lines.append("="*70)
+        print("\n".join(lines))
@@ -1,6 +1,13 @@
+import functools
+
 from pydantic import BaseModel, Field
 from typing import Literal
 
+TOOL_NAME = "cost_of_revenue_calculation"
+
+# Batch variant: one call answers several companies, one `results` entry each
+BATCH_TOOL_NAME = "cost_of_revenue_calculation_batch"
+
 
 class CostOfRevenueCalculationOutput(BaseModel):
     cost_of_revenue: float = Field(..., description="The extracted, calculated, or imputed cost of revenue value")
@@ -10,191 +17,120 @@ class CostOfRevenueCalculationOutput(BaseModel):
     confidence: Literal["High", "Medium", "Low"] = Field(..., description="Confidence level based on reliability of method used")
 
 
+class CostOfRevenueBatchCalculationOutput(BaseModel):
+    results: list[CostOfRevenueCalculationOutput] = Field(..., description="One result per company, in the order the companies were listed")
+
+
+# JSON schema of one CostOfRevenueCalculationOutput, shared by every provider's
+# tool definition
+COST_OF_REVENUE_PROPERTIES = {
+    "cost_of_revenue": {
+        "type": "number",
+        "description": "The extracted, calculated, or imputed cost of revenue value"
+    },
+    "method": {
+        "type": "string",
+        "enum": ["direct_extraction", "calculation", "imputation"],
+        "description": "Method used to determine cost of revenue"
+    },
+    "formula_used": {
+        "type": "string",
+        "description": "The specific formula or XBRL concept(s) used"
+    },
+    "reasoning": {
+        "type": "string",
+        "description": "Clear explanation of logic and assumptions made"
+    },
+    "confidence": {
+        "type": "string",
+        "enum": ["High", "Medium", "Low"],
+        "description": "Confidence level based on reliability of method used"
+    }
+}
+COST_OF_REVENUE_REQUIRED = ["cost_of_revenue", "method", "formula_used", "reasoning", "confidence"]
+
+
 class FinancialsCalculationTool:
+    # Definitions are built once per variant and shared; treat them as read-only
     @staticmethod
-    def openai_tool_definition():
-        return {
+    @functools.cache
+    def openai_tool_definition(batch: bool = False):
+        tool = {
             "type": "function",
             "function": {
-                "name": "cost_of_revenue_calculation",
+                "name": TOOL_NAME,
                 "description": "Extract or calculate the cost of revenue from XBRL facts.",
                 "parameters": {
                     "type": "object",
-                    "properties": {
-                        "cost_of_revenue": {
-                            "type": "number",
-                            "description": "The extracted, calculated, or imputed cost of revenue value"
-                        },
-                        "method": {
-                            "type": "string",
-                            "enum": ["direct_extraction", "calculation", "imputation"],
-                            "description": "Method used to determine cost of revenue"
-                        },
-                        "formula_used": {
-                            "type": "string",
-                            "description": "The specific formula or XBRL concept(s) used"
-                        },
-                        "reasoning": {
-                            "type": "string",
-                            "description": "Clear explanation of logic and assumptions made"
-                        },
-                        "confidence": {
-                            "type": "string",
-                            "enum": ["High", "Medium", "Low"],
-                            "description": "Confidence level based on reliability of method used"
-                        }
-                    },
-                    "required": ["cost_of_revenue", "method", "formula_used", "reasoning", "confidence"],
+                    "properties": COST_OF_REVENUE_PROPERTIES,
+                    "required": COST_OF_REVENUE_REQUIRED,
                     "additionalProperties": False
                 }
             }
         }
+        if batch:
+            _to_batch_tool(tool["function"], "parameters")
+        return tool
     
+    # DeepSeek and Kimi expose OpenAI-compatible tool calling, so they share
+    # the OpenAI definitions object
     @staticmethod
-    def deepseek_tool_definition():
-        return {
-            "type": "function",
-            "function": {
-                "name": "cost_of_revenue_calculation",
-                "description": "Extract or calculate the cost of revenue from XBRL facts.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "cost_of_revenue": {
-                            "type": "number",
-                            "description": "The extracted, calculated, or imputed cost of revenue value"
-                        },
-                        "method": {
-                            "type": "string",
-                            "enum": ["direct_extraction", "calculation", "imputation"],
-                            "description": "Method used to determine cost of revenue"
-                        },
-                        "formula_used": {
-                            "type": "string",
-                            "description": "The specific formula or XBRL concept(s) used"
-                        },
-                        "reasoning": {
-                            "type": "string",
-                            "description": "Clear explanation of logic and assumptions made"
-                        },
-                        "confidence": {
-                            "type": "string",
-                            "enum": ["High", "Medium", "Low"],
-                            "description": "Confidence level based on reliability of method used"
-                        }
-                    },
-                    "required": ["cost_of_revenue", "method", "formula_used", "reasoning", "confidence"],
-                    "additionalProperties": False
-                }
-            }
-        }
+    def deepseek_tool_definition(batch: bool = False):
+        return FinancialsCalculationTool.openai_tool_definition(batch)
     
     @staticmethod
-    def kimi_tool_definition():
-        return {
-            "type": "function",
-            "function": {
-                "name": "cost_of_revenue_calculation",
-                "description": "Extract or calculate the cost of revenue from XBRL facts.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "cost_of_revenue": {
-                            "type": "number",
-                            "description": "The extracted, calculated, or imputed cost of revenue value"
-                        },
-                        "method": {
-                            "type": "string",
-                            "enum": ["direct_extraction", "calculation", "imputation"],
-                            "description": "Method used to determine cost of revenue"
-                        },
-                        "formula_used": {
-                            "type": "string",
-                            "description": "The specific formula or XBRL concept(s) used"
-                        },
-                        "reasoning": {
-                            "type": "string",
-                            "description": "Clear explanation of logic and assumptions made"
-                        },
-                        "confidence": {
-                            "type": "string",
-                            "enum": ["High", "Medium", "Low"],
-                            "description": "Confidence level based on reliability of method used"
-                        }
-                    },
-                    "required": ["cost_of_revenue", "method", "formula_used", "reasoning", "confidence"],
-                    "additionalProperties": False
-                }
-            }
-        }
+    def kimi_tool_definition(batch: bool = False):
+        return FinancialsCalculationTool.openai_tool_definition(batch)
     
     @staticmethod
-    def anthropic_tool_definition():
-        return {
-        "name": "cost_of_revenue_calculation",
-        "description": "Extract or calculate the cost of revenue from XBRL facts.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "cost_of_revenue": {
-                    "type": "number",
-                    "description": "The extracted, calculated, or imputed cost of revenue value"
-                },
-                "method": {
-                    "type": "string",
-                    "enum": ["direct_extraction", "calculation", "imputation"],
-                    "description": "Method used to determine cost of revenue"
-                },
-                "formula_used": {
-                    "type": "string",
-                    "description": "The specific formula or XBRL concept(s) used"
-                },
-                "reasoning": {
-                    "type": "string",
-                    "description": "Clear explanation of logic and assumptions made"
-                },
-                "confidence": {
-                    "type": "string",
-                    "enum": ["High", "Medium", "Low"],
-                    "description": "Confidence level based on reliability of method used"
-                }
-            },
-            "required": ["cost_of_revenue", "method", "formula_used", "reasoning", "confidence"],
-            "additionalProperties": False
+    @functools.cache
+    def anthropic_tool_definition(batch: bool = False):
+        tool = {
+            "name": TOOL_NAME,
+            "description": "Extract or calculate the cost of revenue from XBRL facts.",
+            "input_schema": {
+                "type": "object",
+                "properties": COST_OF_REVENUE_PROPERTIES,
+                "required": COST_OF_REVENUE_REQUIRED,
+                "additionalProperties": False
+            }
         }
-    }
+        if batch:
+            _to_batch_tool(tool, "input_schema")
+        return tool
     
     @staticmethod
-    def gemini_tool_definition():
-        return {
-            "name": "cost_of_revenue_calculation",
+    @functools.cache
+    def gemini_tool_definition(batch: bool = False):
+        tool = {
+            "name": TOOL_NAME,
             "description": "Extract or calculate the cost of revenue from XBRL facts.",
             "parameters": {
                 "type": "object",
-                "properties": {
-                    "cost_of_revenue": {
-                        "type": "number",
-                        "description": "The extracted, calculated, or imputed cost of revenue value"
-                    },
-                    "method": {
-                        "type": "string",
-                        "enum": ["direct_extraction", "calculation", "imputation"],
-                        "description": "Method used to determine cost of revenue"
-                    },
-                    "formula_used": {
-                        "type": "string",
-                        "description": "The specific formula or XBRL concept(s) used"
-                    },
-                    "reasoning": {
-                        "type": "string",
-                        "description": "Clear explanation of logic and assumptions made"
-                    },
-                    "confidence": {
-                        "type": "string",
-                        "enum": ["High", "Medium", "Low"],
-                        "description": "Confidence level based on reliability of method used"
-                    }
-                },
-                "required": ["cost_of_revenue", "method", "formula_used", "reasoning", "confidence"]
+                "properties": COST_OF_REVENUE_PROPERTIES,
+                "required": COST_OF_REVENUE_REQUIRED
             }
-        }
\ No newline at end of file
+        }
+        if batch:
+            _to_batch_tool(tool, "parameters")
+        return tool
+
+
+def _to_batch_tool(function: dict, schema_key: str) -> None:
+    """Rewrite a single-company tool definition in place into its batch variant."""
+    item_schema = function[schema_key]
+    function["name"] = BATCH_TOOL_NAME
+    function["description"] = "Extract or calculate the cost of revenue from XBRL facts for each listed company."
+    function[schema_key] = {
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "description": "One result per company, in the order the companies were listed",
+                "items": item_schema
+            }
+        },
+        "required": ["results"]
+    }
+    if "additionalProperties" in item_schema:
+        function[schema_key]["additionalProperties"] = False
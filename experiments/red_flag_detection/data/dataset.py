@@ -5,16 +5,31 @@ This module provides the RedFlagDetectionDataset class for organizing and access
 financial data with different flag classifications.
 """
 
-import json
 import os
+import sys
+from collections import defaultdict
 from typing import Optional
 
+import orjson
+
 
 class RedFlagDetectionDataset:
     """Dataset container for red flag detection data."""
     
     def __init__(self, companies: list[dict[str, str]]):
         self._companies = companies
+        
+        # Label indexes, built in a single pass so accessors don't rescan every company;
+        # accessors return copies, so callers can't modify an index through a result
+        self._by_label: dict[str, list[dict[str, str]]] = defaultdict(list)
+        self._red_flag_companies: list[dict[str, str]] = []
+        for company in companies:
+            # Intern the few repeated labels so copies share one object and compare by identity
+            company["label"] = sys.intern(company["label"])
+            self._by_label[company["label"]].append(company)
+            if company["label"] != "Green Flag":
+                self._red_flag_companies.append(company)
+        self._labels = frozenset(self._by_label)
     
     def get_companies(self) -> list[dict[str, str]]:
         """Get all companies in the dataset."""
@@ -22,15 +37,15 @@ class RedFlagDetectionDataset:
     
     def get_red_flag_companies(self) -> list[dict[str, str]]:
         """Get companies with red flag labels."""
-        return [c for c in self._companies if c["label"] != "Green Flag"]
+        return list(self._red_flag_companies)
     
     def get_green_flag_companies(self) -> list[dict[str, str]]:
         """Get companies with green flag labels."""
-        return [c for c in self._companies if c["label"] == "Green Flag"]
+        return list(self._by_label.get("Green Flag", ()))
     
     def get_companies_by_label(self, label: str) -> list[dict[str, str]]:
         """Get companies with a specific label."""
-        return [c for c in self._companies if c["label"] == label]
+        return list(self._by_label.get(label, ()))
     
     def size(self) -> int:
         """Get the total number of companies in the dataset."""
@@ -38,7 +53,7 @@ class RedFlagDetectionDataset:
     
     def labels(self) -> set[str]:
         """Get all unique labels in the dataset."""
-        return {c["label"] for c in self._companies}
+        return set(self._labels)
     
     def save_to_json(self, filepath: str) -> None:
         """Save the dataset to a JSON file."""
@@ -57,8 +72,8 @@ class RedFlagDetectionDataset:
             }
         }
         
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         
         print(f"Dataset saved to {filepath}")
     
@@ -69,13 +84,13 @@ class RedFlagDetectionDataset:
             return None
         
         try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
+            with open(filepath, 'rb') as f:
+                data = orjson.loads(f.read())
             
             companies = data.get('companies', [])
             print(f"Dataset loaded from {filepath} ({len(companies)} companies)")
             return cls(companies)
         
-        except (json.JSONDecodeError, KeyError) as e:
+        except (orjson.JSONDecodeError, KeyError) as e:
             print(f"Error loading dataset from {filepath}: {e}")
             return None 
\ No newline at end of file
@@ -1,81 +1,80 @@
+import asyncio
+import functools
 import os
 from clients.fd_client import FinancialDatasetsClient
 from experiments.red_flag_detection.data.dataset import RedFlagDetectionDataset
 
-def get_red_flag_companies(fd_client: FinancialDatasetsClient) -> list[dict[str, str]]:
-    """Get red flag companies from the FinancialDatasetsClient."""
-    # Create red flag filters and get companies
-    red_flag_configs = [
-        {
-            "filters": [
-                {"field": "current_ratio", "operator": "lt", "value": 1.0},
-                {"field": "quick_ratio", "operator": "lt", "value": 0.8},
-                {"field": "debt_to_equity", "operator": "gt", "value": 2.0},
-                {"field": "total_debt", "operator": "gt", "value": 2000000000}
-            ],
-            "label": "Financial Health Issues",
-            "limit": 15
-        },
-        {
-            "filters": [
-                {"field": "net_margin", "operator": "lt", "value": 5.0},
-                {"field": "operating_margin", "operator": "lt", "value": 5.0},
-                {"field": "net_income", "operator": "lt", "value": 0}
-            ],
-            "label": "Declining Profitability",
-            "limit": 15
-        },
-        {
-            "filters": [
-                {"field": "earnings_growth", "operator": "lt", "value": 0},
-                {"field": "free_cash_flow_growth", "operator": "lt", "value": 0},
-                {"field": "revenue_growth", "operator": "lt", "value": 0}
-            ],
-            "label": "Earnings Decline",
-            "limit": 10
-        },
-        {
-            "filters": [
-                {"field": "inventory_turnover", "operator": "lt", "value": 2.0},
-                {"field": "receivables_turnover", "operator": "lt", "value": 4.0},
-                {"field": "asset_turnover", "operator": "lt", "value": 0.5}
-            ],
-            "label": "Inefficient Operations",
-            "limit": 10
-        }
-    ]
-    
-    # Fetch red flag companies
-    red_flag_companies = []
-    for config in red_flag_configs:
-        companies = fd_client.search(
-            filters=config["filters"],
-            label=config["label"],
-            limit=config["limit"],
-            period="ttm"
-        )
-        print(f"Found {len(companies)} companies with label {config.get('label')}")
-        red_flag_companies.extend(companies)
-    return red_flag_companies
+# Screens for companies showing each kind of red flag
+RED_FLAG_SEARCHES = [
+    {
+        "filters": [
+            {"field": "current_ratio", "operator": "lt", "value": 1.0},
+            {"field": "quick_ratio", "operator": "lt", "value": 0.8},
+            {"field": "debt_to_equity", "operator": "gt", "value": 2.0},
+            {"field": "total_debt", "operator": "gt", "value": 2000000000}
+        ],
+        "label": "Financial Health Issues",
+        "limit": 15,
+        "period": "ttm"
+    },
+    {
+        "filters": [
+            {"field": "net_margin", "operator": "lt", "value": 5.0},
+            {"field": "operating_margin", "operator": "lt", "value": 5.0},
+            {"field": "net_income", "operator": "lt", "value": 0}
+        ],
+        "label": "Declining Profitability",
+        "limit": 15,
+        "period": "ttm"
+    },
+    {
+        "filters": [
+            {"field": "earnings_growth", "operator": "lt", "value": 0},
+            {"field": "free_cash_flow_growth", "operator": "lt", "value": 0},
+            {"field": "revenue_growth", "operator": "lt", "value": 0}
+        ],
+        "label": "Earnings Decline",
+        "limit": 10,
+        "period": "ttm"
+    },
+    {
+        "filters": [
+            {"field": "inventory_turnover", "operator": "lt", "value": 2.0},
+            {"field": "receivables_turnover", "operator": "lt", "value": 4.0},
+            {"field": "asset_turnover", "operator": "lt", "value": 0.5}
+        ],
+        "label": "Inefficient Operations",
+        "limit": 10,
+        "period": "ttm"
+    }
+]
 
-def get_green_flag_companies(fd_client: FinancialDatasetsClient) -> list[dict[str, str]]:
-    """Get green flag companies from the FinancialDatasetsClient."""
-    green_flag_filters = [
+# Screen for financially healthy companies
+GREEN_FLAG_SEARCH = {
+    "filters": [
         {"field": "net_income", "operator": "gte", "value": 250000000},
         {"field": "total_debt", "operator": "lt", "value": 2000000000},
         {"field": "current_ratio", "operator": "gte", "value": 1.2},
         {"field": "free_cash_flow", "operator": "gte", "value": 100000000}
-    ]
-    
-    green_flag_companies = fd_client.search(
-        filters=green_flag_filters,
-        label="Green Flag",
-        limit=50,
-        period="ttm"
-    )
-    print(f"Found {len(green_flag_companies)} companies with label Green Flag")
-    return green_flag_companies
+    ],
+    "label": "Green Flag",
+    "limit": 50,
+    "period": "ttm"
+}
+
+def search_companies(fd_client: FinancialDatasetsClient, searches: list[dict]) -> list[dict[str, str]]:
+    """Run the screens concurrently and return their companies in screen order."""
+    results = asyncio.run(fd_client.asearch_many(searches))
 
+    companies = []
+    for search, found in zip(searches, results):
+        print(f"Found {len(found)} companies with label {search.get('label')}")
+        companies.extend(found)
+    return companies
+
+# Cached so repeated calls in one process share the loaded dataset instead of
+# re-reading the file; call create_dataset.cache_clear() to reload
+@functools.cache
 def create_dataset() -> RedFlagDetectionDataset:
     """Create a red flag detection dataset with both red and green flag companies.
     
@@ -95,23 +94,17 @@ def create_dataset() -> RedFlagDetectionDataset:
     
     # If the dataset does not exist, create it
     print("No cached dataset found. Building from API...")
-    fd_client = FinancialDatasetsClient()
-    all_companies = []
-
-    # # Get red flag companies
-    print("Getting red flag companies...")
-    red_flag_companies = get_red_flag_companies(fd_client)
-    all_companies.extend(red_flag_companies)
-
-    # Get green flag companies
-    print("Getting green flag companies...")
-    green_flag_companies = get_green_flag_companies(fd_client)
-    all_companies.extend(green_flag_companies)
+    with FinancialDatasetsClient() as fd_client:
+        # Get red and green flag companies; the search API ANDs its filters, so
+        # each screen is its own request and all of them go out at once
+        print("Getting red and green flag companies...")
+        all_companies = search_companies(fd_client, RED_FLAG_SEARCHES + [GREEN_FLAG_SEARCH])
 
-    # Get financial metrics for all companies
-    for company in all_companies:
-        financial_metrics = fd_client.get_financial_metrics(company.get("ticker"))
-        company["financial_metrics"] = financial_metrics
+        # Get financial metrics for all companies
+        tickers = [company.get("ticker") for company in all_companies]
+        snapshots = asyncio.run(fd_client.aget_financial_metrics_many(tickers))
+        for company, financial_metrics in zip(all_companies, snapshots):
+            company["financial_metrics"] = financial_metrics
     
     # Combine the datasets and return
     dataset = RedFlagDetectionDataset(all_companies)
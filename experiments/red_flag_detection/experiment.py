@@ -1,8 +1,13 @@
-import json
+import asyncio
+import os
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from pydantic import BaseModel
-from typing import Optional
+from collections import Counter
+from dataclasses import dataclass
+from functools import cached_property
+import orjson
+from pydantic import BaseModel, ValidationError
+from typing import Callable, Iterable, Literal, Optional
+from clients import AIMDController, LLMCache, close_shared_async_client, retry_async, warmup_all
 from clients.anthropic_client import AnthropicClient
 from clients.openai_client import OpenAIClient
 from clients.gemini_client import GeminiClient
@@ -10,7 +15,19 @@ from clients.kimi_client import KimiClient
 from clients.deepseek_client import DeepSeekClient
 from experiments.red_flag_detection.data.dataset import RedFlagDetectionDataset
 from experiments.red_flag_detection.data.factory import create_dataset
-from experiments.red_flag_detection.tools import RedFlagDetectionOutput, RedFlagDetectionTool
+from experiments.red_flag_detection.tools import TOOL_NAME, RedFlagDetectionOutput, RedFlagDetectionTool
+
+# Static system prompt shared by every request, kept apart from the per-company
+# metrics. At ~130 tokens it is below the 1024-token minimum for prompt caching,
+# so no provider caches it; Anthropic receives it as a plain system argument
+SYSTEM_PROMPT = (
+    "You are a financial analyst. You are given the financial metrics for a public company.\n\n"
+    "Your job is to determine whether this company shows signs of financial red flags.\n\n"
+    f"**Respond using the {TOOL_NAME} function call**, with:\n"
+    "- `has_red_flags: true` if the company appears financially risky (e.g., negative cash flow, high debt, poor liquidity, declining earnings).\n"
+    "- `has_red_flags: false` if the company appears financially healthy overall.\n"
+    "Also include a short explanation citing relevant metrics."
+)
 
 
 class LLMPredictionResult(BaseModel):
@@ -24,6 +41,18 @@ class LLMPredictionResult(BaseModel):
     cost: float
     duration: float
 
+
+class CachedOutput(BaseModel):
+    """A model's parsed answer and its billing, as stored in the result cache.
+
+    Ground truth is deliberately left out: it comes from the current dataset
+    when the prediction is rebuilt, never from the cache.
+    """
+    output: RedFlagDetectionOutput
+    cost: float
+    duration: float
+
+
 class ModelResults(BaseModel):
     """All results from a specific model."""
     model_provider: str
@@ -41,451 +70,603 @@ class ExperimentResults(BaseModel):
     kimi: Optional[ModelResults] = None
     deepseek: Optional[ModelResults] = None
 
-class RedFlagDetectionExperiment:
-  def __init__(self):
-    self.anthropic_client = AnthropicClient()
-    self.openai_client = OpenAIClient()
-    self.gemini_client = GeminiClient()
-    self.kimi_client = KimiClient()
-    self.deepseek_client = DeepSeekClient()
-
-  def run(self, dataset: RedFlagDetectionDataset) -> ExperimentResults:
-    # Get the companies from the dataset
-    companies = dataset.get_companies()
 
-    # Execute all LLM calls in parallel using ThreadPoolExecutor
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        # Submit all tasks
-        future_to_provider = {
-            executor.submit(self._call_openai, companies): "openai",
-            executor.submit(self._call_anthropic, companies): "anthropic", 
-            executor.submit(self._call_gemini, companies): "gemini",
-            executor.submit(self._call_kimi, companies): "kimi",
-            executor.submit(self._call_deepseek, companies): "deepseek"
-        }
-        
-        # Collect results as they complete
-        results = {}
-        for future in as_completed(future_to_provider):
-            provider = future_to_provider[future]
-            try:
-                result = future.result()
-                results[provider] = result
-                print(f"✅ {provider.capitalize()} completed")
-            except Exception as e:
-                print(f"❌ {provider.capitalize()} failed: {e}")
-                results[provider] = None
-
-    return ExperimentResults(
-        openai=results.get("openai"),
-        anthropic=results.get("anthropic"),
-        gemini=results.get("gemini"),
-        kimi=results.get("kimi"),
-        deepseek=results.get("deepseek")
+@dataclass(frozen=True)
+class CompanyPrompt:
+    """One company's prompt and ground truth, prepared once and shared by every provider."""
+    ticker: str
+    label: str | None
+    ground_truth: bool  # True unless the company came from the green flag screen
+    messages: list[dict]
+
+
+@dataclass
+class ProviderSpec:
+    """How to call one provider for the experiment and read its responses."""
+    name: str  # Field name in ExperimentResults
+    label: str  # Display name in progress output
+    emoji: str
+    client_attr: str  # Experiment attribute holding the client, built on first use
+    model: str
+    input_cost_per_million_tokens: float
+    output_cost_per_million_tokens: float
+    tool_def_fn: Callable[[], dict]
+    parse_fn: Callable[[any], str | dict | None]  # Tool call arguments (JSON or dict) from a response, None if absent
+    usage_fn: Callable[[any], tuple[float, float]]  # Billed (input, output) tokens of a response
+    force_tool_choice: bool = False  # Name the tool in tool_choice (OpenAI-style APIs)
+    system_prompt: Literal["message", "argument", "cached_blocks"] = "message"  # How the system prompt is sent
+    batch_api: bool = False  # Whether the client supports submit_batch()/poll_batch()
+    max_concurrency: int | None = None  # Default cap on in-flight requests; None uses the experiment's concurrency_limit
+
+    def request(self, messages: list[dict]) -> dict:
+        """Build the client keyword arguments for one company's prompt."""
+        kwargs = {"model": self.model, "tools": self._tools}
+        if self.force_tool_choice:
+            kwargs["tool_choice"] = {"type": "function", "function": {"name": TOOL_NAME}}
+
+        system, user_messages = messages[0]["content"], messages[1:]
+        if self.system_prompt == "message":
+            kwargs["messages"] = messages
+        elif self.system_prompt == "argument":
+            kwargs["messages"] = user_messages
+            kwargs["system"] = system
+        else:
+            # Mark the static system prompt as a prompt-cache breakpoint
+            kwargs["messages"] = user_messages
+            kwargs["system"] = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+        return kwargs
+
+    @cached_property
+    def _tools(self) -> list[dict]:
+        """Tool list sent with every request, built once per provider."""
+        return [self.tool_def_fn()]
+
+    def cost(self, response: any, discount: float = 1.0) -> float:
+        """Price a response from its token usage."""
+        input_tokens, output_tokens = self.usage_fn(response)
+        input_cost = (input_tokens / 1_000_000) * self.input_cost_per_million_tokens
+        output_cost = (output_tokens / 1_000_000) * self.output_cost_per_million_tokens
+        return (input_cost + output_cost) * discount
+
+
+def _openai_tool_arguments(response: any) -> str | None:
+    """Raw JSON tool call arguments from an OpenAI-style chat completion."""
+    tool_calls = response.choices[0].message.tool_calls
+    if not tool_calls:
+        return None
+    return tool_calls[0].function.arguments
+
+
+def _anthropic_tool_arguments(response: any) -> dict | None:
+    """Input of the first tool use block in an Anthropic message."""
+    tool_use = next((block for block in response.content if block.type == "tool_use"), None)
+    return tool_use.input if tool_use else None
+
+
+def _gemini_tool_arguments(response: any) -> dict | None:
+    """Arguments of the function call in a Gemini response."""
+    if not response.candidates:
+        return None
+    # Walk the nested response models once instead of per check
+    parts = response.candidates[0].content.parts
+    function_call = parts[0].function_call if parts else None
+    return function_call.args if function_call else None
+
+
+def _openai_usage(response: any) -> tuple[float, float]:
+    return response.usage.prompt_tokens, response.usage.completion_tokens
+
+
+def _anthropic_usage(response: any) -> tuple[float, float]:
+    usage = response.usage
+    # Prompt-cache writes bill at 1.25x the input rate, reads at 0.1x
+    billed_input_tokens = (
+        usage.input_tokens
+        + 1.25 * (usage.cache_creation_input_tokens or 0)
+        + 0.1 * (usage.cache_read_input_tokens or 0)
     )
+    return billed_input_tokens, usage.output_tokens
+
+
+def _gemini_usage(response: any) -> tuple[float, float]:
+    return response.usage_metadata.prompt_token_count, response.usage_metadata.candidates_token_count
+
+
+# Every provider the experiment evaluates, in reporting order
+PROVIDERS = [
+    ProviderSpec(
+        name="openai",
+        label="OpenAI",
+        emoji="🤖",
+        client_attr="openai_client",
+        model="o3",
+        input_cost_per_million_tokens=2.50,
+        output_cost_per_million_tokens=10.00,
+        tool_def_fn=RedFlagDetectionTool.openai_tool_definition,
+        parse_fn=_openai_tool_arguments,
+        usage_fn=_openai_usage,
+        force_tool_choice=True,
+        batch_api=True,
+        max_concurrency=5,
+    ),
+    ProviderSpec(
+        name="anthropic",
+        label="Anthropic",
+        emoji="🧠",
+        client_attr="anthropic_client",
+        model="claude-opus-4-20250514",
+        input_cost_per_million_tokens=3.00,
+        output_cost_per_million_tokens=15.00,
+        tool_def_fn=RedFlagDetectionTool.anthropic_tool_definition,
+        parse_fn=_anthropic_tool_arguments,
+        usage_fn=_anthropic_usage,
+        system_prompt="argument",
+        batch_api=True,
+        max_concurrency=3,
+    ),
+    ProviderSpec(
+        name="gemini",
+        label="Gemini",
+        emoji="💎",
+        client_attr="gemini_client",
+        model="gemini-2.5-pro",
+        input_cost_per_million_tokens=2.50,
+        output_cost_per_million_tokens=10.00,
+        tool_def_fn=RedFlagDetectionTool.gemini_tool_definition,
+        parse_fn=_gemini_tool_arguments,
+        usage_fn=_gemini_usage,
+        system_prompt="argument",
+        max_concurrency=5,
+    ),
+    ProviderSpec(
+        name="kimi",
+        label="Kimi",
+        emoji="🌙",
+        client_attr="kimi_client",
+        model="kimi-k2-0711-preview",
+        input_cost_per_million_tokens=1.00,  # Estimated pricing
+        output_cost_per_million_tokens=3.00,  # Estimated pricing
+        tool_def_fn=RedFlagDetectionTool.kimi_tool_definition,
+        parse_fn=_openai_tool_arguments,
+        usage_fn=_openai_usage,
+        force_tool_choice=True,
+    ),
+    ProviderSpec(
+        name="deepseek",
+        label="DeepSeek",
+        emoji="🔍",
+        client_attr="deepseek_client",
+        model="deepseek-reasoner",
+        input_cost_per_million_tokens=0.14,  # Estimated pricing based on DeepSeek's competitive rates
+        output_cost_per_million_tokens=0.28,  # Estimated pricing
+        tool_def_fn=RedFlagDetectionTool.deepseek_tool_definition,
+        parse_fn=_openai_tool_arguments,
+        usage_fn=_openai_usage,
+    ),
+]
 
-  def _generate_prompt(self, ticker: str, metrics: dict) -> list[dict]:
-    """Format the user message for LLM input."""
-    return [{
-        "role": "user",
-        "content": (
-            f"You are a financial analyst. You are given the financial metrics for the public company {ticker}.\n\n"
-            f"Here are the financial metrics:\n{json.dumps(metrics, indent=2)}\n\n"
-            "Your job is to determine whether this company shows signs of financial red flags.\n\n"
-            "**Respond using the red_flag_detection function call**, with:\n"
-            "- `has_red_flags: true` if the company appears financially risky (e.g., negative cash flow, high debt, poor liquidity, declining earnings).\n"
-            "- `has_red_flags: false` if the company appears financially healthy overall.\n"
-            "Also include a short explanation citing relevant metrics."
-        )
-    }]
 
-  def _call_openai(self, companies: list[dict]) -> ModelResults:
-    predictions = []
-    model = "o3"
-    input_cost_per_million_tokens = 2.50
-    output_cost_per_million_tokens = 10.00
-    total_cost = 0.0
-    total_time = 0.0
-
-    
-    print(f"\n🤖 OpenAI: Processing {len(companies)} companies...")
-
-    for i, company in enumerate(companies, 1):
-        ticker = company["ticker"]
-        metrics = company["financial_metrics"]
-        print(f"  OpenAI ({i}/{len(companies)}): {ticker}")
-
-        messages = self._generate_prompt(ticker, metrics)
-
-        try:
-            # Start timing the API call
-            start_time = time.time()
-            
-            response = self.openai_client.call(
-              model=model,
-              messages=messages,
-              tools=[RedFlagDetectionTool.openai_tool_definition()],
-              tool_choice={"type": "function", "function": {"name": "red_flag_detection"}}
-            )
-            
-            # End timing the API call
-            end_time = time.time()
-            call_duration = end_time - start_time
-            total_time += call_duration
-
-            # Calculate cost from usage
-            prompt_tokens = response.usage.prompt_tokens
-            completion_tokens = response.usage.completion_tokens
-            
-            input_cost = (prompt_tokens / 1_000_000) * input_cost_per_million_tokens
-            output_cost = (completion_tokens / 1_000_000) * output_cost_per_million_tokens
-            call_cost = input_cost + output_cost
-            total_cost += call_cost
+class RedFlagDetectionExperiment:
+  def __init__(
+      self,
+      concurrency_limit: int = 8,
+      max_attempts: int = 5,
+      realtime: bool = True,
+      checkpoint_dir: str | None = None,
+      provider_concurrency: dict[str, int] | None = None
+  ):
+    # Maximum in-flight requests per provider without its own cap; AIMD backs
+    # off below it on slow calls and rate limits
+    self.concurrency_limit = concurrency_limit
+    # Per-provider concurrency caps overriding the ProviderSpec defaults, e.g.
+    # {"anthropic": 3}; also settable as <PROVIDER>_CONCURRENCY, e.g. ANTHROPIC_CONCURRENCY=3
+    self.provider_concurrency = provider_concurrency or {}
+    # Attempts per request before a transient failure counts as permanent
+    self.max_attempts = max_attempts
+    # Parsed predictions per (model, prompt), so reruns skip answered prompts
+    self.result_cache = LLMCache()
+    # False sends OpenAI and Anthropic through their Batch APIs: half the price,
+    # but results can take up to 24 hours and per-call latency is not measured
+    self.realtime = realtime
+    # Directory for per-provider JSONL checkpoints of finished predictions;
+    # an interrupted run resumes from them instead of paying for them again
+    self.checkpoint_dir = checkpoint_dir
+
+  # Clients are built on first use, so providers left out of a run never
+  # construct SDK clients or need their API keys
+  @cached_property
+  def openai_client(self) -> OpenAIClient:
+    return OpenAIClient()
+
+  @cached_property
+  def anthropic_client(self) -> AnthropicClient:
+    return AnthropicClient()
+
+  @cached_property
+  def gemini_client(self) -> GeminiClient:
+    return GeminiClient()
+
+  @cached_property
+  def kimi_client(self) -> KimiClient:
+    return KimiClient()
+
+  @cached_property
+  def deepseek_client(self) -> DeepSeekClient:
+    return DeepSeekClient()
+
+  def run(
+      self,
+      dataset: RedFlagDetectionDataset,
+      providers: Iterable[str] | None = None
+  ) -> ExperimentResults:
+    """Evaluate the selected providers (all by default); the rest are left as None in the results."""
+    selected = [spec for spec in PROVIDERS if providers is None or spec.name in providers]
+    unknown = set(providers or ()) - {spec.name for spec in PROVIDERS}
+    if unknown:
+      raise ValueError(f"Unknown providers: {', '.join(sorted(unknown))}")
 
-            # Parse the tool call
-            tool_calls = response.choices[0].message.tool_calls
-            if not tool_calls:
-                print(f"No tool call returned for {ticker}")
-                continue
+    # Get the companies from the dataset
+    companies = dataset.get_companies()
 
-            args = json.loads(tool_calls[0].function.arguments)
-            parsed = RedFlagDetectionOutput(**args)
+    # Build the selected clients up front, so a missing API key fails before any spend
+    for spec in selected:
+      self._client(spec)
 
-            predictions.append(LLMPredictionResult(
-                ticker=ticker,
-                model=model,
-                ground_truth=company.get("label") != "Green Flag",
-                ground_truth_label=company.get("label"),
-                prediction=parsed.has_red_flags,
-                reasoning=parsed.reasoning,
-                cost=call_cost,
-                duration=call_duration,
-            ))
+    # Execute the providers concurrently on one event loop
+    results = asyncio.run(self._run_providers(selected, companies))
 
-            # Add sleep to avoid rate limiting
-            time.sleep(1)
+    return ExperimentResults(**results)
 
-        except Exception as e:
-            print(f"Error processing {ticker}: {e}")
+  def _client(self, spec: ProviderSpec) -> any:
+    return getattr(self, spec.client_attr)
 
-    return ModelResults(
-        model_provider="openai", 
-        model_name=model, 
-        predictions=predictions, 
-        average_cost=total_cost / len(predictions) if predictions else 0,
-        average_duration=total_time / len(predictions) if predictions else 0
+  def _controller(self, spec: ProviderSpec) -> AIMDController:
+    """AIMD window for one provider, capped by its override, its spec default or concurrency_limit, in that order."""
+    cap = int(
+        self.provider_concurrency.get(spec.name)
+        or os.getenv(f"{spec.name.upper()}_CONCURRENCY")
+        or spec.max_concurrency
+        or self.concurrency_limit
     )
-  
-  def _call_anthropic(self, companies: list[dict]) -> ModelResults:
-    predictions = []
-    model = "claude-opus-4-20250514"
-    input_cost_per_million_tokens = 3.00
-    output_cost_per_million_tokens = 15.00
-    total_cost = 0.0
-    total_time = 0.0
-    
-    print(f"\n🧠 Anthropic: Processing {len(companies)} companies...")
-
-    for i, company in enumerate(companies, 1):
-        ticker = company["ticker"]
-        metrics = company["financial_metrics"]
-        print(f"  Anthropic ({i}/{len(companies)}): {ticker}")
-
-        messages = self._generate_prompt(ticker, metrics)
-
-        try:
-            # Start timing the API call
-            start_time = time.time()
-            
-            response = self.anthropic_client.call(
-                model=model,
-                messages=messages,
-                tools=[RedFlagDetectionTool.anthropic_tool_definition()]
-            )
-            
-            # End timing the API call
-            end_time = time.time()
-            call_duration = end_time - start_time
-            total_time += call_duration
-
-            # Calculate cost from usage
-            prompt_tokens = response.usage.input_tokens
-            completion_tokens = response.usage.output_tokens
-            
-            input_cost = (prompt_tokens / 1_000_000) * input_cost_per_million_tokens
-            output_cost = (completion_tokens / 1_000_000) * output_cost_per_million_tokens
-            call_cost = input_cost + output_cost
-            total_cost += call_cost
-
-            # Find the tool use block in the response content
-            tool_use = None
-            for content_block in response.content:
-                if content_block.type == "tool_use":
-                    tool_use = content_block
-                    break
-            
-            if not tool_use:
-                print(f"No tool call returned for {ticker}")
-                continue
-
-            args = tool_use.input
-            parsed = RedFlagDetectionOutput(**args)
-
-            predictions.append(LLMPredictionResult(
-                ticker=ticker,
-                model=model,
-                ground_truth=company.get("label") != "Green Flag",
-                ground_truth_label=company.get("label"),
-                prediction=parsed.has_red_flags,
-                reasoning=parsed.reasoning,
-                cost=call_cost,
-                duration=call_duration,
-            ))
-
-            # Add sleep to avoid rate limiting
-            time.sleep(1)
-
-        except Exception as e:
-            print(f"Error processing {ticker} with Claude: {e}")
-
-    return ModelResults(
-        model_provider="anthropic", 
-        model_name=model, 
-        predictions=predictions,
-        average_cost=total_cost / len(predictions) if predictions else 0,
-        average_duration=total_time / len(predictions) if predictions else 0
+    return AIMDController(initial=min(self.concurrency_limit, cap), maximum=cap)
+
+  async def _run_providers(self, providers: list[ProviderSpec], companies: list[dict]) -> dict[str, ModelResults | None]:
+    # Open pooled connections on this loop before the first real requests, so
+    # TLS handshakes are not counted in the first calls' durations
+    await warmup_all([self._client(spec) for spec in providers], concurrency=self.concurrency_limit)
+
+    # Serialize each company's metrics and read its label once; every provider
+    # sends the same messages and scores against the same ground truth
+    items = [self._prepare(company) for company in companies]
+
+    # A company listed under several screens gets the same prompt each time;
+    # ask each model once and share the answer with its other listings
+    items, duplicates = _dedupe_prompts(items)
+
+    # Providers without a batch API stay on the live path when realtime is off
+    provider_calls = {
+        spec.name: (
+            self._call_provider(spec, items)
+            if self.realtime or not spec.batch_api
+            else self._call_provider_batch(spec, items)
+        )
+        for spec in providers
+    }
+    outcomes = await asyncio.gather(*provider_calls.values(), return_exceptions=True)
+
+    # This run's event loop ends here; a later run opens a fresh pool on its own loop
+    await close_shared_async_client()
+
+    # Collect results, isolating providers that failed outright
+    results = {}
+    for provider, outcome in zip(provider_calls, outcomes):
+        if isinstance(outcome, Exception):
+            print(f"❌ {provider.capitalize()} failed: {outcome}")
+            results[provider] = None
+        else:
+            print(f"✅ {provider.capitalize()} completed")
+            results[provider] = self._share_duplicates(outcome, duplicates)
+    return results
+
+  def _share_duplicates(self, results: ModelResults, duplicates: list[CompanyPrompt]) -> ModelResults:
+    """Copy each answered prediction to the company's other listings, with their own labels."""
+    if not duplicates:
+      return results
+
+    answered = {prediction.ticker: prediction for prediction in results.predictions}
+    shared = [
+        answered[item.ticker].model_copy(update={
+            "ground_truth": item.ground_truth,
+            "ground_truth_label": item.label,
+            # No call was made for the copy; the averages keep describing real calls
+            "cost": 0.0,
+            "duration": 0.0,
+        })
+        for item in duplicates
+        if item.ticker in answered
+    ]
+    return results.model_copy(update={"predictions": results.predictions + shared})
+
+  def _prepare(self, company: dict) -> CompanyPrompt:
+    """Build a company's prompt and read its ground truth from the screen label."""
+    label = company.get("label")
+    return CompanyPrompt(
+        ticker=company["ticker"],
+        label=label,
+        ground_truth=label != "Green Flag",
+        messages=self._generate_prompt(company["ticker"], company["financial_metrics"]),
     )
-  
-  def _call_gemini(self, companies: list[dict]) -> ModelResults:
-    predictions = []
-    model = "gemini-2.5-pro"
-    input_cost_per_million_tokens = 2.50
-    output_cost_per_million_tokens = 10.00
-    total_cost = 0.0
-    total_time = 0.0
-    
-    print(f"\n💎 Gemini: Processing {len(companies)} companies...")
-
-    for i, company in enumerate(companies, 1):
-        ticker = company["ticker"]
-        metrics = company["financial_metrics"]
-        print(f"  Gemini ({i}/{len(companies)}): {ticker}")
-
-        messages = self._generate_prompt(ticker, metrics)
 
-        try:
-            # Start timing the API call
-            start_time = time.time()
-            
-            response = self.gemini_client.call(
-                model=model,
-                messages=messages,
-                tools=[RedFlagDetectionTool.gemini_tool_definition()]
-            )
-            
-            # End timing the API call
-            end_time = time.time()
-            call_duration = end_time - start_time
-            total_time += call_duration
-
-            # Calculate cost from usage
-            prompt_tokens = response.usage_metadata.prompt_token_count
-            completion_tokens = response.usage_metadata.candidates_token_count
-            
-            input_cost = (prompt_tokens / 1_000_000) * input_cost_per_million_tokens
-            output_cost = (completion_tokens / 1_000_000) * output_cost_per_million_tokens
-            call_cost = input_cost + output_cost
-            total_cost += call_cost
-
-            # Check for function call in Gemini response
-            function_call = None
-            if (response.candidates and 
-                response.candidates[0].content.parts and 
-                response.candidates[0].content.parts[0].function_call):
-                function_call = response.candidates[0].content.parts[0].function_call
-            
-            if not function_call:
-                print(f"No tool call returned for {ticker}")
-                continue
-
-            # Get arguments from function call
-            args = function_call.args
-            parsed = RedFlagDetectionOutput(**args)
-
-            predictions.append(LLMPredictionResult(
-                ticker=ticker,
-                model=model,
-                ground_truth=company.get("label") != "Green Flag",
-                ground_truth_label=company.get("label"),
-                prediction=parsed.has_red_flags,
-                reasoning=parsed.reasoning,
-                cost=call_cost,
-                duration=call_duration,
-            ))
-
-            # Add sleep to avoid rate limiting
-            time.sleep(1)
-
-        except Exception as e:
-            print(f"Error processing {ticker} with Gemini: {e}")
-
-    return ModelResults(
-        model_provider="gemini", 
-        model_name=model, 
-        predictions=predictions,
-        average_cost=total_cost / len(predictions) if predictions else 0,
-        average_duration=total_time / len(predictions) if predictions else 0
+  def _generate_prompt(self, ticker: str, metrics: dict) -> list[dict]:
+    """Format the static system prompt and the company's financial metrics for LLM input."""
+    # Metrics go in compact JSON: indentation costs tokens but tells the model nothing
+    return [
+      {"role": "system", "content": SYSTEM_PROMPT},
+      {"role": "user", "content": f"Company: {ticker}\n\nHere are the financial metrics:\n{orjson.dumps(metrics).decode()}"},
+    ]
+
+  def _load_prediction(self, spec: ProviderSpec, item: CompanyPrompt) -> LLMPredictionResult | None:
+    """Rebuild the prediction cached for this prompt and tool schema, labelled from the current item."""
+    cached = self.result_cache.get(spec.model, item.messages, tools=spec._tools)
+    if cached is None:
+      return None
+    try:
+      entry = CachedOutput.model_validate(cached)
+    except ValidationError:
+      # An entry written by an older version of the experiment; ask again
+      return None
+    return self._to_prediction(spec.model, item, entry.output, entry.cost, entry.duration)
+
+  def _store_prediction(
+      self,
+      spec: ProviderSpec,
+      item: CompanyPrompt,
+      parsed: RedFlagDetectionOutput,
+      cost: float,
+      duration: float
+  ) -> None:
+    entry = CachedOutput(output=parsed, cost=cost, duration=duration)
+    self.result_cache.set(spec.model, item.messages, entry.model_dump(), tools=spec._tools)
+
+  def _checkpoint_path(self, spec: ProviderSpec) -> str | None:
+    if self.checkpoint_dir is None:
+      return None
+    return os.path.join(self.checkpoint_dir, f"results_{spec.name}.jsonl")
+
+  def _resume_checkpoint(
+      self,
+      spec: ProviderSpec,
+      items: list[CompanyPrompt]
+  ) -> tuple[list[LLMPredictionResult], list[CompanyPrompt]]:
+    """Return the predictions checkpointed by an interrupted run and the companies still to do."""
+    path = self._checkpoint_path(spec)
+    if path is None or not os.path.exists(path):
+      return [], items
+
+    resumed = [prediction for prediction in _load_jsonl(path) if prediction.model == spec.model]
+    # Count per ticker, since a company can appear under more than one screen
+    remaining = Counter(prediction.ticker for prediction in resumed)
+    pending = []
+    for item in items:
+      if remaining[item.ticker] > 0:
+        remaining[item.ticker] -= 1
+      else:
+        pending.append(item)
+
+    if resumed:
+      print(f"  {spec.label}: resuming {len(resumed)} predictions from {path}")
+    return resumed, pending
+
+  def _append_checkpoint(self, spec: ProviderSpec, prediction: LLMPredictionResult) -> None:
+    path = self._checkpoint_path(spec)
+    if path is not None:
+      os.makedirs(self.checkpoint_dir, exist_ok=True)
+      _append_jsonl(path, prediction)
+
+  def _finish_checkpoint(self, spec: ProviderSpec, complete: bool) -> None:
+    """Retire the checkpoint once every company has a prediction, so the next run starts fresh."""
+    path = self._checkpoint_path(spec)
+    if complete and path is not None and os.path.exists(path):
+      os.replace(path, path.removesuffix(".jsonl") + ".done.jsonl")
+
+  def _to_prediction(
+      self,
+      model: str,
+      item: CompanyPrompt,
+      parsed: RedFlagDetectionOutput,
+      cost: float,
+      duration: float
+  ) -> LLMPredictionResult:
+    return LLMPredictionResult(
+        ticker=item.ticker,
+        model=model,
+        ground_truth=item.ground_truth,
+        ground_truth_label=item.label,
+        prediction=parsed.has_red_flags,
+        reasoning=parsed.reasoning,
+        cost=cost,
+        duration=duration,
     )
 
-  def _call_kimi(self, companies: list[dict]) -> ModelResults:
-    predictions = []
-    model = "kimi-k2-0711-preview"
-    input_cost_per_million_tokens = 1.00  # Estimated pricing
-    output_cost_per_million_tokens = 3.00  # Estimated pricing
-    total_cost = 0.0
-    total_time = 0.0
+  def _parse_output(self, args: str | dict) -> RedFlagDetectionOutput:
+    """Parse tool call arguments, raw JSON or already decoded."""
+    # JSON strings go straight to pydantic's parser, without an intermediate dict
+    if isinstance(args, (str, bytes)):
+      return RedFlagDetectionOutput.model_validate_json(args)
+    return RedFlagDetectionOutput.model_validate(args)
+
+  async def _call_provider(self, spec: ProviderSpec, items: list[CompanyPrompt]) -> ModelResults:
+    company_count = len(items)
+    resumed, items = self._resume_checkpoint(spec, items)
+    total_cost = sum(prediction.cost for prediction in resumed)
+    total_time = sum(prediction.duration for prediction in resumed)
+    controller = self._controller(spec)
     
-    print(f"\n🌙 Kimi: Processing {len(companies)} companies...")
-
-    for i, company in enumerate(companies, 1):
-        ticker = company["ticker"]
-        metrics = company["financial_metrics"]
-        print(f"  Kimi ({i}/{len(companies)}): {ticker}")
-
-        messages = self._generate_prompt(ticker, metrics)
-
+    print(f"\n{spec.emoji} {spec.label}: Processing {len(items)} companies...")
+
+    async def predict(i: int, item: CompanyPrompt) -> LLMPredictionResult | None:
+        nonlocal total_cost, total_time
+        ticker, messages = item.ticker, item.messages
+
+        cached = self._load_prediction(spec, item)
+        if cached:
+            total_cost += cached.cost
+            total_time += cached.duration
+            return cached
+
+        start_time = time.perf_counter()
+
+        async def attempt_call() -> any:
+            # Hold a controller slot only while a request is in flight, so backoff
+            # sleeps free it and every retry waits out an open circuit breaker
+            nonlocal start_time
+            async with controller:
+                # Time only the attempt that answers, not the backoff or queueing before it
+                start_time = time.perf_counter()
+                return await self._client(spec).acall(**spec.request(messages))
+
+        def on_retry(attempt: int, error: BaseException) -> None:
+            controller.update(None, error=error)
+            print(f"  {spec.label}: retrying {ticker} (attempt {attempt + 1}/{self.max_attempts}) after {type(error).__name__}")
+
+        print(f"  {spec.label} ({i}/{len(items)}): {ticker}")
         try:
-            # Start timing the API call
-            start_time = time.time()
-            
-            response = self.kimi_client.call(
-                model=model,
-                messages=messages,
-                tools=[RedFlagDetectionTool.kimi_tool_definition()],
-                tool_choice={"type": "function", "function": {"name": "red_flag_detection"}}
-            )
+            # Retry rate limits, timeouts and 5xx with backoff; other errors fail at once
+            response = await retry_async(attempt_call, retries=self.max_attempts - 1, on_retry=on_retry)
             
             # End timing the API call
-            end_time = time.time()
+            end_time = time.perf_counter()
             call_duration = end_time - start_time
             total_time += call_duration
+            controller.update(call_duration)
 
             # Calculate cost from usage
-            prompt_tokens = response.usage.prompt_tokens
-            completion_tokens = response.usage.completion_tokens
-            
-            input_cost = (prompt_tokens / 1_000_000) * input_cost_per_million_tokens
-            output_cost = (completion_tokens / 1_000_000) * output_cost_per_million_tokens
-            call_cost = input_cost + output_cost
+            call_cost = spec.cost(response)
             total_cost += call_cost
 
-            # Parse the tool call (OpenAI-style response)
-            tool_calls = response.choices[0].message.tool_calls
-            if not tool_calls:
+            # Parse the tool call
+            args = spec.parse_fn(response)
+            if args is None:
                 print(f"No tool call returned for {ticker}")
-                continue
+                return None
 
-            args = json.loads(tool_calls[0].function.arguments)
-            parsed = RedFlagDetectionOutput(**args)
-
-            predictions.append(LLMPredictionResult(
-                ticker=ticker,
-                model=model,
-                ground_truth=company.get("label") != "Green Flag",
-                ground_truth_label=company.get("label"),
-                prediction=parsed.has_red_flags,
-                reasoning=parsed.reasoning,
-                cost=call_cost,
-                duration=call_duration,
-            ))
-
-            # Add sleep to avoid rate limiting
-            time.sleep(1)
+            parsed = self._parse_output(args)
+            self._store_prediction(spec, item, parsed, call_cost, call_duration)
+            prediction = self._to_prediction(spec.model, item, parsed, call_cost, call_duration)
+            self._append_checkpoint(spec, prediction)
+            return prediction
 
         except Exception as e:
-            print(f"Error processing {ticker} with Kimi: {e}")
+            controller.update(None, error=e)
+            print(f"Error processing {ticker} with {spec.label} (permanent failure): {e}")
+            return None
+
+    results = await asyncio.gather(*(predict(i, item) for i, item in enumerate(items, 1)))
+    predictions = resumed + [prediction for prediction in results if prediction is not None]
+    self._finish_checkpoint(spec, complete=len(predictions) == company_count)
 
     return ModelResults(
-        model_provider="kimi", 
-        model_name=model, 
-        predictions=predictions,
+        model_provider=spec.name, 
+        model_name=spec.model, 
+        predictions=predictions, 
         average_cost=total_cost / len(predictions) if predictions else 0,
         average_duration=total_time / len(predictions) if predictions else 0
     )
 
-  def _call_deepseek(self, companies: list[dict]) -> ModelResults:
-    predictions = []
-    model = "deepseek-reasoner"
-    input_cost_per_million_tokens = 0.14  # Estimated pricing based on DeepSeek's competitive rates
-    output_cost_per_million_tokens = 0.28  # Estimated pricing
-    total_cost = 0.0
-    total_time = 0.0
-    
-    print(f"\n🔍 DeepSeek: Processing {len(companies)} companies...")
-
-    for i, company in enumerate(companies, 1):
-        ticker = company["ticker"]
-        metrics = company["financial_metrics"]
-        print(f"  DeepSeek ({i}/{len(companies)}): {ticker}")
-
-        messages = self._generate_prompt(ticker, metrics)
-
-        try:
-            # Start timing the API call
-            start_time = time.time()
-            
-            response = self.deepseek_client.call(
-                model=model,
-                messages=messages,
-                tools=[RedFlagDetectionTool.deepseek_tool_definition()]
-            )
-            
-            # End timing the API call
-            end_time = time.time()
-            call_duration = end_time - start_time
-            total_time += call_duration
-
-            # Calculate cost from usage
-            prompt_tokens = response.usage.prompt_tokens
-            completion_tokens = response.usage.completion_tokens
-            
-            input_cost = (prompt_tokens / 1_000_000) * input_cost_per_million_tokens
-            output_cost = (completion_tokens / 1_000_000) * output_cost_per_million_tokens
-            call_cost = input_cost + output_cost
-            total_cost += call_cost
-
-            # Parse the tool call (OpenAI-style response)
-            tool_calls = response.choices[0].message.tool_calls
-            if not tool_calls:
-                print(f"No tool call returned for {ticker}")
-                continue
-
-            args = json.loads(tool_calls[0].function.arguments)
-            parsed = RedFlagDetectionOutput(**args)
-
-            predictions.append(LLMPredictionResult(
-                ticker=ticker,
-                model=model,
-                ground_truth=company.get("label") != "Green Flag",
-                ground_truth_label=company.get("label"),
-                prediction=parsed.has_red_flags,
-                reasoning=parsed.reasoning,
-                cost=call_cost,
-                duration=call_duration,
-            ))
-
-            # Add sleep to avoid rate limiting
-            time.sleep(1)
-
-        except Exception as e:
-            print(f"Error processing {ticker} with DeepSeek: {e}")
+  async def _call_provider_batch(self, spec: ProviderSpec, items: list[CompanyPrompt]) -> ModelResults:
+    company_count = len(items)
+    resumed, items = self._resume_checkpoint(spec, items)
+    total_cost = sum(prediction.cost for prediction in resumed)
+
+    print(f"\n{spec.emoji} {spec.label}: submitting {len(items)} companies to the batch API...")
+
+    predictions = resumed
+    pending = {}
+    for i, item in enumerate(items):
+      cached = self._load_prediction(spec, item)
+      if cached:
+        predictions.append(cached)
+        total_cost += cached.cost
+        continue
+      # Tickers can repeat across screens, so key requests by position
+      pending[f"company-{i}"] = item
+
+    start_time = time.perf_counter()
+    responses = {}
+    if pending:
+      requests = [{"custom_id": custom_id, **spec.request(item.messages)} for custom_id, item in pending.items()]
+      # The batch client methods block, so keep them off the event loop
+      batch_id = await asyncio.to_thread(self._client(spec).submit_batch, requests)
+      responses = await asyncio.to_thread(self._client(spec).poll_batch, batch_id)
+    # Wall time of the whole batch, spread over the companies it answered
+    call_duration = (time.perf_counter() - start_time) / max(len(pending), 1)
+
+    for custom_id, item in pending.items():
+      ticker = item.ticker
+      response = responses.get(custom_id)
+      if response is None:
+        print(f"No batch result returned for {ticker}")
+        continue
+      try:
+        # Batch requests bill at half the real-time rates
+        call_cost = spec.cost(response, discount=0.5)
+        total_cost += call_cost
+
+        args = spec.parse_fn(response)
+        if args is None:
+          print(f"No tool call returned for {ticker}")
+          continue
+
+        parsed = self._parse_output(args)
+        self._store_prediction(spec, item, parsed, call_cost, call_duration)
+        prediction = self._to_prediction(spec.model, item, parsed, call_cost, call_duration)
+        self._append_checkpoint(spec, prediction)
+        predictions.append(prediction)
+      except Exception as e:
+        print(f"Error processing {ticker} with {spec.label}: {e}")
+
+    self._finish_checkpoint(spec, complete=len(predictions) == company_count)
 
     return ModelResults(
-        model_provider="deepseek", 
-        model_name=model, 
+        model_provider=spec.name,
+        model_name=spec.model,
         predictions=predictions,
         average_cost=total_cost / len(predictions) if predictions else 0,
-        average_duration=total_time / len(predictions) if predictions else 0
+        average_duration=sum(prediction.duration for prediction in predictions) / len(predictions) if predictions else 0
     )
 
 
+def _dedupe_prompts(items: list[CompanyPrompt]) -> tuple[list[CompanyPrompt], list[CompanyPrompt]]:
+  """Split out companies whose prompt repeats an earlier one, returning the unique companies and the repeats."""
+  seen = set()
+  unique, duplicates = [], []
+  for item in items:
+    key = item.messages[-1]["content"]
+    if key in seen:
+      duplicates.append(item)
+      continue
+    seen.add(key)
+    unique.append(item)
+  return unique, duplicates
+
+
+def _append_jsonl(path: str, prediction: LLMPredictionResult) -> None:
+  """Append a prediction as a JSON line, synced to disk before returning."""
+  with open(path, "a") as f:
+    f.write(prediction.model_dump_json() + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _load_jsonl(path: str) -> list[LLMPredictionResult]:
+  predictions = []
+  with open(path) as f:
+    for line in f:
+      if not line.strip():
+        continue
+      try:
+        predictions.append(LLMPredictionResult.model_validate_json(line))
+      except ValueError:
+        # A line torn by an interrupted write; that company is simply redone
+        continue
+  return predictions
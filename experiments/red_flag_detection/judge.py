@@ -1,4 +1,5 @@
-from experiments.common.models import ExperimentResults, ModelResults, ModelEvaluationMetrics, ComparisonResults
+from experiments.common.models import ModelEvaluationMetrics, ComparisonResults
+from experiments.red_flag_detection.experiment import ExperimentResults, ModelResults
 
 
 class RedFlagDetectionJudge:
@@ -37,11 +38,18 @@ class RedFlagDetectionJudge:
         """Evaluate a single model's performance."""
         predictions = model_results.predictions
         
-        # Calculate confusion matrix components
-        tp = sum(1 for p in predictions if p.prediction == True and p.ground_truth == True)
-        fp = sum(1 for p in predictions if p.prediction == True and p.ground_truth == False)
-        tn = sum(1 for p in predictions if p.prediction == False and p.ground_truth == False)
-        fn = sum(1 for p in predictions if p.prediction == False and p.ground_truth == True)
+        # Calculate confusion matrix components in a single pass
+        tp = fp = tn = fn = 0
+        for p in predictions:
+            if p.prediction:
+                if p.ground_truth:
+                    tp += 1
+                else:
+                    fp += 1
+            elif p.ground_truth:
+                fn += 1
+            else:
+                tn += 1
         
         # Calculate metrics
         total = len(predictions)
@@ -1,4 +1,5 @@
 import os
+import orjson
 from data.factory import create_dataset
 from experiments.red_flag_detection.experiment import RedFlagDetectionExperiment
 from experiments.red_flag_detection.judge import RedFlagDetectionJudge
@@ -7,6 +8,9 @@ from datetime import datetime
 def main():
     """Load red flag and green flag companies dataset with JSON caching."""
     
+    # Name the results file after the run's start, not the end of the LLM phase
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
     print("=== Red Flag Detection Dataset ===")
     
     # Load dataset using the simplified factory
@@ -17,22 +21,28 @@ def main():
     print(f"Red flag companies: {len(dataset.get_red_flag_companies())}")
     print(f"Green flag companies: {len(dataset.get_green_flag_companies())}")
 
-    # Run the experiment
-    experiment = RedFlagDetectionExperiment()
+    # Run the experiment, checkpointing predictions so an interrupted run can resume
+    current_dir = os.path.dirname(__file__)
+    experiment = RedFlagDetectionExperiment(checkpoint_dir=os.path.join(current_dir, "checkpoints"))
     results = experiment.run(dataset)
 
     # Evaluate the results
     judge = RedFlagDetectionJudge()
     evaluation_results = judge.evaluate(results)
 
-    # Pretty print the ComparisonResults
-    print(evaluation_results.model_dump_json(indent=2))
+    # Serialize the ComparisonResults once; the same bytes are printed and then
+    # written to the results file below
+    metrics_json = orjson.dumps(evaluation_results.model_dump(mode="json"), option=orjson.OPT_INDENT_2)
+    print(metrics_json.decode())
 
     # Save the results to a JSON file with timestamp
-    current_dir = os.path.dirname(__file__)
-    json_filepath = os.path.join(current_dir, f"red_flag_detection_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-    with open(json_filepath, "w") as f:
-        f.write(evaluation_results.model_dump_json(indent=2))
+    json_filepath = os.path.join(current_dir, f"red_flag_detection_results_{timestamp}.json")
+
+    # Write to a temporary file first so a killed run never leaves a partial results file
+    tmp_filepath = f"{json_filepath}.tmp"
+    with open(tmp_filepath, "wb") as f:
+        f.write(metrics_json)
+    os.replace(tmp_filepath, json_filepath)
 
 if __name__ == "__main__":
     main()
@@ -1,126 +1,82 @@
+import functools
+
 from pydantic import BaseModel, Field
 
+TOOL_NAME = "red_flag_detection"
+
 
 class RedFlagDetectionOutput(BaseModel):
     has_red_flags: bool = Field(..., description="True if the company has red flags, False otherwise")
     reasoning: str = Field(..., description="Explanation of the decision, citing relevant financial metrics")
 
 
+# JSON schema of one RedFlagDetectionOutput, shared by every provider's tool
+# definition
+RED_FLAG_PROPERTIES = {
+    "has_red_flags": {
+        "type": "boolean",
+        "description": "True if the company has financial red flags"
+    },
+    "reasoning": {
+        "type": "string",
+        "description": "Explanation for the red flag judgment, referencing financial metrics"
+    }
+}
+RED_FLAG_REQUIRED = ["has_red_flags", "reasoning"]
+
+
 class RedFlagDetectionTool:
+    # Definitions are built once and shared; treat them as read-only
     @staticmethod
+    @functools.cache
     def openai_tool_definition():
         return {
             "type": "function",
             "function": {
-                "name": "red_flag_detection",
+                "name": TOOL_NAME,
                 "description": "Determine if a company has financial red flags based on its financial metrics.",
                 "parameters": {
                     "type": "object",
-                    "properties": {
-                        "has_red_flags": {
-                            "type": "boolean",
-                            "description": "True if the company has financial red flags"
-                        },
-                        "reasoning": {
-                            "type": "string",
-                            "description": "Explanation for the red flag judgment, referencing financial metrics"
-                        }
-                    },
-                    "required": ["has_red_flags", "reasoning"],
+                    "properties": RED_FLAG_PROPERTIES,
+                    "required": RED_FLAG_REQUIRED,
                     "additionalProperties": False
                 }
             }
         }
-    
+
+    # DeepSeek and Kimi expose OpenAI-compatible tool calling, so they share
+    # the OpenAI definition object
     @staticmethod
     def deepseek_tool_definition():
-        return {
-            "type": "function",
-            "function": {
-                "name": "red_flag_detection",
-                "description": "Determine if a company has financial red flags based on its financial metrics.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "has_red_flags": {
-                            "type": "boolean",
-                            "description": "True if the company has financial red flags"
-                        },
-                        "reasoning": {
-                            "type": "string",
-                            "description": "Explanation for the red flag judgment, referencing financial metrics"
-                        }
-                    },
-                    "required": ["has_red_flags", "reasoning"],
-                    "additionalProperties": False
-                }
-            }
-        }
-    
+        return RedFlagDetectionTool.openai_tool_definition()
+
     @staticmethod
     def kimi_tool_definition():
-        return {
-            "type": "function",
-            "function": {
-                "name": "red_flag_detection",
-                "description": "Determine if a company has financial red flags based on its financial metrics.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "has_red_flags": {
-                            "type": "boolean",
-                            "description": "True if the company has financial red flags"
-                        },
-                        "reasoning": {
-                            "type": "string",
-                            "description": "Explanation for the red flag judgment, referencing financial metrics"
-                        }
-                    },
-                    "required": ["has_red_flags", "reasoning"],
-                    "additionalProperties": False
-                }
-            }
-        }
-    
+        return RedFlagDetectionTool.openai_tool_definition()
+
     @staticmethod
+    @functools.cache
     def anthropic_tool_definition():
         return {
-        "name": "red_flag_detection",
-        "description": "Determine if a company has financial red flags based on its financial metrics.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "has_red_flags": {
-                    "type": "boolean",
-                    "description": "True if the company has financial red flags"
-                },
-                "reasoning": {
-                    "type": "string",
-                    "description": "Explanation for the red flag judgment, referencing financial metrics"
-                }
-            },
-            "required": ["has_red_flags", "reasoning"],
-            "additionalProperties": False
+            "name": TOOL_NAME,
+            "description": "Determine if a company has financial red flags based on its financial metrics.",
+            "input_schema": {
+                "type": "object",
+                "properties": RED_FLAG_PROPERTIES,
+                "required": RED_FLAG_REQUIRED,
+                "additionalProperties": False
+            }
         }
-    }
-    
+
     @staticmethod
+    @functools.cache
     def gemini_tool_definition():
         return {
-            "name": "red_flag_detection",
+            "name": TOOL_NAME,
             "description": "Determine if a company has financial red flags based on its financial metrics.",
             "parameters": {
                 "type": "object",
-                "properties": {
-                    "has_red_flags": {
-                        "type": "boolean",
-                        "description": "True if the company has financial red flags"
-                    },
-                    "reasoning": {
-                        "type": "string",
-                        "description": "Explanation for the red flag judgment, referencing financial metrics"
-                    }
-                },
-                "required": ["has_red_flags", "reasoning"]
+                "properties": RED_FLAG_PROPERTIES,
+                "required": RED_FLAG_REQUIRED
             }
-        }
\ No newline at end of file
+        }